@@ -59,27 +59,49 @@ The objective was to visually summarize Netflix's catalog across several key dim
 """
 
 import sys, subprocess, os
+import importlib.util
+
+# REPORT_HEADLESS=1 (cron/CI): Agg backend, no windows or renderers, figures closed after saving
+headless = os.environ.get("REPORT_HEADLESS", "0") == "1"
+if headless:
+    import matplotlib
+    matplotlib.use("Agg")
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import altair as alt
-import altair_viewer
 import plotly.express as px
+from cache import load_csv_cached
+from catalog import prepare_catalog
 
+# find_spec only locates a package; it does not import it a second time
 def install_if_missing(package):
-    try:
-        __import__(package)
-    except ImportError:
+    if importlib.util.find_spec(package) is None:
         subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
-for pkg in ["pandas", "altair", "altair_viewer", "matplotlib", "seaborn", "plotly"]:
-    install_if_missing(pkg)
+# REPORT_FAST_START=1 skips the probe when the environment is known to be complete
+if os.environ.get("REPORT_FAST_START", "0") != "1":
+    for pkg in ["pandas", "altair", "matplotlib", "seaborn", "plotly"]:
+        install_if_missing(pkg)
 
-file_path = r"C:\Users\14163\Desktop\university cu boulder\Fundamentals of Data Visualization\Data\netflix_titles.csv"
-out_dir = r"C:\Users\14163\Desktop\university cu boulder\Fundamentals of Data Visualization\Data"
+def show_figure():
+    """Show the current matplotlib figure, then release it."""
+    if not headless:
+        plt.show()
+    plt.close('all')
+
+# Same settings as Main.py's --input / --out-dir defaults
+file_path = os.environ.get("REPORT_INPUT", "netflix_titles.csv")
+out_dir = os.environ.get("REPORT_OUT_DIR") or os.path.dirname(os.path.abspath(file_path))
 os.makedirs(out_dir, exist_ok=True)
 
-df = pd.read_csv(file_path)
+df = load_csv_cached(file_path)
+
+# Parse dates, split multi-valued columns and derive year/month once
+catalog = prepare_catalog(df)
+if catalog.unparsed_dates:
+    print(f" Warning: {catalog.unparsed_dates} date_added values could not be parsed")
 
 print(f" Dataset Loaded: {df.shape[0]} rows × {df.shape[1]} columns")
 display(df.head())
@@ -108,9 +130,7 @@ The bar chart below presents the ten most frequent genres of content available o
 The color palette was selected to maintain distinct visual separation between genres while avoiding overstimulation. This design choice facilitates comparative analysis, enabling viewers to quickly identify the dominance of specific content types such as *International Movies*, *Dramas*, and *Comedies*.
 """
 
-genres = df['listed_in'].dropna().str.split(', ')
-genres_exploded = genres.explode()
-top_genres = genres_exploded.value_counts().head(10)
+top_genres = catalog.exploded('listed_in').value_counts().head(10)
 
 plt.figure(figsize=(14, 6))
 sns.barplot(x=top_genres.values, y=top_genres.index, palette="Set2")
@@ -119,7 +139,7 @@ plt.xlabel('Number of Titles')
 plt.ylabel('Genre')
 plt.tight_layout()
 plt.savefig(os.path.join(out_dir, 'Figure_1_Genres.png'))
-plt.show()
+show_figure()
 
 """
 
@@ -139,8 +159,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 # Extract and preprocess country data
-df_country = df.dropna(subset=["country"])
-countries = df_country["country"].str.split(', ').explode()
+countries = catalog.exploded('country')
 top_countries = countries.value_counts().head(10)
 
 # Set up the plot
@@ -169,7 +188,7 @@ plt.ylabel('Number of Titles', fontsize=12)
 plt.xticks(rotation=45, fontsize=11)
 plt.yticks(fontsize=11)
 plt.tight_layout()
-plt.show()
+show_figure()
 
 """
 
@@ -183,9 +202,7 @@ The use of a **horizontal layout** enhances legibility, particularly for longer
 Anupam Kher tops the list with the highest number of appearances, followed closely by other notable figures such as Shah Rukh Khan and Julie Tejwani. This distribution reflects Netflix's strong inclusion of Indian cinema and television personalities, emphasizing regional production trends in the global content library.
 """
 
-df_cast = df.dropna(subset=['cast'])
-df_cast = df_cast.assign(cast=df_cast['cast'].str.split(', ')).explode('cast')
-top_actors = df_cast['cast'].value_counts().head(10)
+top_actors = catalog.exploded('cast').value_counts().head(10)
 
 plt.figure(figsize=(12, 6))
 sns.barplot(x=top_actors.values, y=top_actors.index, palette='coolwarm')
@@ -194,7 +211,7 @@ plt.xlabel('Number of Titles')
 plt.ylabel('Actor')
 plt.tight_layout()
 plt.savefig(os.path.join(out_dir, 'Figure_3_Top_Actors.png'))
-plt.show()
+show_figure()
 
 """
 
@@ -218,9 +235,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Extract month names from date_added
-df_month = df.dropna(subset=['date_added']).copy()
-df_month['month_added'] = pd.to_datetime(df_month['date_added'], errors='coerce').dt.month_name()
+# Month names from date_added (parsed once in prepare_catalog)
+df_month = catalog.titles
 
 # Ordered month list
 month_order = ['January', 'February', 'March', 'April', 'May', 'June',
@@ -238,7 +254,7 @@ plt.xlabel('Month')
 plt.ylabel('Number of Titles')
 plt.xticks(rotation=45)
 plt.tight_layout()
-plt.show()
+show_figure()
 
 """
 
@@ -263,7 +279,7 @@ plt.title("Distribution of Content Types on Netflix")
 plt.axis('equal')
 plt.tight_layout()
 plt.savefig(os.path.join(out_dir, 'Figure_4_Type_Distribution.png'))
-plt.show()
+show_figure()
 
 """## Content Rating Distribution
 
@@ -286,7 +302,7 @@ plt.title("Top 8 Content Ratings Distribution")
 plt.axis('equal')
 plt.tight_layout()
 plt.savefig(os.path.join(out_dir, 'Figure_5_Rating_Distribution.png'))
-plt.show()
+show_figure()
 
 """
 
@@ -302,7 +318,7 @@ A muted 'sunsetdark' color scale was applied to highlight differences in content
 
 # Global Choropleth of Titles by Country
 import plotly.express as px
-country_counts = df['country'].dropna().str.split(', ').explode().value_counts().reset_index()
+country_counts = catalog.exploded('country').value_counts().reset_index()
 country_counts.columns = ['Country', 'Number of Titles']
 country_counts['Log Titles'] = country_counts['Number of Titles'].apply(lambda x: round(x**0.5, 2))
 
@@ -322,7 +338,8 @@ fig = px.choropleth(
 fig.update_geos(showcoastlines=True, projection_type='natural earth')
 
 # DISPLAY in Jupyter Notebook
-fig.show()
+if not headless:
+    fig.show()
 
 """## Top 25 netflix-producing countries (color-coded)
 
@@ -337,9 +354,8 @@ The map uses a natural earth projection for geographical familiarity and include
 import plotly.express as px
 import pandas as pd
 
-# Clean and explode country data
-df_country = df.dropna(subset=["country"])
-countries = df_country["country"].str.split(', ').explode()
+# Country data, already split by prepare_catalog
+countries = catalog.exploded('country')
 
 # Aggregate and select top 25
 top_countries = countries.value_counts().head(25).reset_index()
@@ -359,7 +375,8 @@ fig = px.choropleth(
 
 fig.update_geos(showcoastlines=True, projection_type='natural earth')
 
-fig.show()
+if not headless:
+    fig.show()
 
 """## Simulated netflix title count by u.s. state
 
@@ -377,7 +394,8 @@ import altair as alt
 from vega_datasets import data as vg_data
 
 # Enable Altair rendering in Jupyter
-alt.renderers.enable('default')  # or 'inline'
+if not headless:
+    alt.renderers.enable('default')  # or 'inline'
 
 # Simulated state data
 us_states = [
@@ -450,10 +468,11 @@ import pandas as pd
 import altair as alt
 
 # Enable inline rendering in Jupyter
-alt.renderers.enable('default')  # Use 'inline' if default fails
+if not headless:
+    alt.renderers.enable('default')  # Use 'inline' if default fails
 
-# Preprocess dates and clean data
-df['year_added'] = pd.to_datetime(df['date_added'], errors='coerce').dt.year
+# Clean data (year_added is derived once in prepare_catalog)
+df['year_added'] = catalog.titles['year_added']
 df_clean = df.dropna(subset=['year_added', 'type']).copy()
 
 # Group by year and content type
@@ -495,13 +514,11 @@ import pandas as pd
 import altair as alt
 
 # Ensure Altair renders inline in Jupyter
-alt.renderers.enable('default')  # optional if using JupyterLab or Jupyter Notebook
+if not headless:
+    alt.renderers.enable('default')  # optional if using JupyterLab or Jupyter Notebook
 
-# Preprocess and expand country data
-df['year_added'] = pd.to_datetime(df['date_added'], errors='coerce').dt.year
-df_country_time = df.dropna(subset=["country", "year_added"]).copy()
-df_country_time['country'] = df_country_time['country'].str.split(', ')
-df_country_time = df_country_time.explode('country')
+# One row per (title, country) with the year it was added
+df_country_time = catalog.exploded_frame('country', ['year_added']).dropna(subset=['year_added'])
 
 # Top 5 most frequent countries
 top5_countries = df_country_time['country'].value_counts().nlargest(5).index
@@ -530,32 +547,17 @@ The frequency declines rapidly with increasing delay, though a long tail persist
 
 """
 
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+from figures import agg_delay, draw_delay
 
-# Drop missing values
-df_delay = df.dropna(subset=['release_year', 'date_added']).copy()
+# Delay between release and addition (derived once in prepare_catalog),
+# counted per whole year for delays of 0–29 years
+delay_counts = agg_delay(catalog)
 
-# Convert date_added to year and compute delay
-df_delay['year_added'] = pd.to_datetime(df_delay['date_added'], errors='coerce').dt.year
-df_delay['delay'] = df_delay['year_added'] - df_delay['release_year']
-
-# Filter delays: keep 0–29 years
-df_delay = df_delay[(df_delay['delay'] >= 0) & (df_delay['delay'] < 30)]
-
-# Plot histogram + KDE
-plt.figure(figsize=(10, 6))
-sns.histplot(df_delay['delay'], bins=30, kde=True, color='darkblue', alpha=0.7)
-
-# Labels and title
-plt.title('Time Between Content Release and Netflix Addition')
-plt.xlabel('Years Delay')
-plt.ylabel('Number of Titles')
-plt.tight_layout()
+# Histogram + KDE, both drawn from the yearly counts
+draw_delay(delay_counts, alpha=0.7)
 
 # Show in Jupyter output
-plt.show()
+show_figure()
 
 """### Title Length vs. Content Type
 
@@ -567,22 +569,8 @@ The visualization reveals a clear dominance of short titles in both movies and T
 
 import altair as alt
 import pandas as pd
-# Create a column for title length category
-df['title_length'] = df['title'].astype(str).apply(len)
-
-def categorize_title_length(length):
-    if length <= 20:
-        return 'Short Title'
-    elif length <= 40:
-        return 'Medium Title'
-    else:
-        return 'Long Title'
-
-df['title_length_category'] = df['title_length'].apply(categorize_title_length)
-
-
-# Group and compute counts
-source = df.groupby(['type', 'title_length_category']).size().reset_index(name='count')
+# Title length category (derived once in prepare_catalog)
+source = catalog.titles.groupby(['type', 'title_length_category'], observed=True).size().reset_index(name='count')
 
 # Order for visual clarity
 title_order = ['Short Title', 'Medium Title', 'Long Title']
@@ -653,36 +641,13 @@ this multivariate view helps reveal structural consistencies and variation patte
 
 """
 
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import warnings
-
-#  Suppress FutureWarnings
-warnings.simplefilter(action='ignore', category=FutureWarning)
-
-# Convert duration to minutes (for Movies only)
-df_movies = df[df['type'] == 'Movie'].copy()
-df_movies['duration_minutes'] = df_movies['duration'].str.replace(' min', '').astype(float)
-
-# Clean rows with missing or invalid values
-df_clean = df_movies.dropna(subset=['release_year', 'year_added', 'duration_minutes', 'title_length_category'])
-
-# Select relevant features
-plot_df = df_clean[['release_year', 'year_added', 'duration_minutes', 'title_length_category']]
-
-#  Create pairplot with color hue
-sns.set(style="ticks", font_scale=1.1)
-pair = sns.pairplot(
-    plot_df,
-    hue='title_length_category',
-    palette='Set2',
-    diag_kind='kde'
-)
+from figures import agg_movie_pairs, draw_movie_pairs
 
-# Add title
-pair.fig.suptitle("Netflix Movies: Pairwise Plot Colored by Title Length", y=1.02)
-plt.show()
+# Movies counted per distinct (title length, release year, year added, minutes);
+# each panel is drawn from binned counts instead of one point per movie
+movie_pairs = agg_movie_pairs(catalog)
+draw_movie_pairs(movie_pairs)
+show_figure()
 
 """### Evaluation Procedure and Results
 
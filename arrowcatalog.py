@@ -0,0 +1,151 @@
+# -------------------------------------
+# 🗺️ Memory-Mapped Catalog for Worker Processes
+# -------------------------------------
+# The prepared catalog (derived columns and CSR-encoded multi-valued
+# columns included) is written once to an uncompressed Arrow IPC file.
+# Every process that needs it maps that file read-only, so workers share
+# the parent's page cache instead of each holding a pickled copy, and
+# handing the catalog to a worker means sending a path.
+#
+# Columns are laid out so that pandas can wrap the mapped buffers without
+# converting them:
+#
+#   categorical   codes (pandas' own code width, -1 = missing); categories in the metadata
+#   Int8/16/...   values plus a `<col>:mask` uint8 column
+#   string        Arrow large strings, wrapped as string[pyarrow]
+#   multi-valued  `<col>:csr`, a large_list<int32> whose offsets / values are
+#                 exactly MultiValueColumn.offsets / codes; dictionary in the metadata
+#
+# Everything mapped is read-only; figures already treat the catalog that way.
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+from cache import cache_paths
+from catalog import Catalog
+from multivalue import MultiValueColumn
+
+FORMAT_VERSION = 1
+META_KEY = b'catalog'
+
+
+def column_arrays(name, series):
+    """Arrow arrays (name -> array) and the metadata that rebuild `series` without copying."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = dtype.categories
+        if categories.dtype != object and not pd.api.types.is_string_dtype(categories.dtype):
+            raise TypeError(f'{name}: only string categories can be mapped')
+        return ({name: pa.array(series.cat.codes.to_numpy())},
+                {'kind': 'category', 'categories': categories.tolist(), 'ordered': bool(dtype.ordered)})
+    if isinstance(series.array, pd.arrays.IntegerArray):
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        mask = series.isna().to_numpy().view(np.uint8)
+        return {name: pa.array(values), f'{name}:mask': pa.array(mask)}, {'kind': 'masked'}
+    if pd.api.types.is_string_dtype(dtype):
+        strings = pa.array(series.astype('string[pyarrow]').array).cast(pa.large_string())
+        return {name: strings}, {'kind': 'string'}
+    return {name: pa.array(series.to_numpy())}, {'kind': 'numpy', 'dtype': str(dtype)}
+
+
+def catalog_path(path, cache_dir=None):
+    """Where the mapped catalog of the CSV at `path` lives (next to its Parquet cache)."""
+    parquet_path, _ = cache_paths(path, cache_dir)
+    return os.path.splitext(parquet_path)[0] + '.catalog.arrow'
+
+
+def write_catalog(catalog, path, key=None, source_columns=None):
+    """Write `catalog` to `path` (atomically). `key` identifies the data and code it was
+    built from and `source_columns` the CSV columns it holds (None: all of them)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    arrays, meta = {}, {'version': FORMAT_VERSION, 'key': key, 'source_columns': source_columns,
+                        'columns': {}, 'multi': {}, 'unparsed_dates': int(catalog.unparsed_dates),
+                        'rows': len(catalog.titles)}
+    for name, series in catalog.titles.items():
+        column, meta['columns'][name] = column_arrays(name, series)
+        arrays.update(column)
+    for name, multi in catalog._multi.items():
+        arrays[f'{name}:csr'] = pa.LargeListArray.from_arrays(pa.array(multi.offsets), pa.array(multi.codes))
+        meta['multi'][name] = {'dictionary': multi.dictionary.tolist()}
+
+    # One record batch, so every mapped column is a single contiguous buffer
+    table = pa.table(arrays).combine_chunks().replace_schema_metadata({META_KEY: json.dumps(meta)})
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_meta(path):
+    """The catalog metadata of a mapped file, or None if there is no usable file."""
+    try:
+        with pa.memory_map(path) as source:
+            schema = pa.ipc.open_file(source).schema
+    except (OSError, pa.ArrowInvalid):
+        return None
+    meta = json.loads(schema.metadata[META_KEY])
+    return meta if meta.get('version') == FORMAT_VERSION else None
+
+
+def is_current(path, key, source_columns=None):
+    """True when `path` holds the catalog for `key` with at least `source_columns`."""
+    meta = read_meta(path)
+    if not meta or meta['key'] != key:
+        return False
+    held = meta['source_columns']
+    return held is None or (source_columns is not None and set(source_columns) <= set(held))
+
+
+def view(table, name):
+    """Zero-copy NumPy view of a mapped column (read-only)."""
+    return table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+
+
+def map_catalog(path):
+    """Catalog backed by the memory-mapped file at `path`."""
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    meta = json.loads(table.schema.metadata[META_KEY])
+
+    columns = {}
+    for name, info in meta['columns'].items():
+        if info['kind'] == 'category':
+            dtype = pd.CategoricalDtype(info['categories'], ordered=info['ordered'])
+            values = pd.Categorical.from_codes(view(table, name), dtype=dtype, validate=False)
+        elif info['kind'] == 'masked':
+            values = pd.arrays.IntegerArray(view(table, name), view(table, f'{name}:mask').view(bool))
+        elif info['kind'] == 'string':
+            values = pd.arrays.ArrowStringArray(table.column(name))
+        else:
+            values = view(table, name)
+        columns[name] = values
+    titles = pd.DataFrame(columns, copy=False)
+
+    multi = {}
+    for name, info in meta['multi'].items():
+        csr = table.column(f'{name}:csr').chunk(0)
+        multi[name] = MultiValueColumn(name, pd.Index(info['dictionary'], name=name),
+                                       csr.values.to_numpy(zero_copy_only=True),
+                                       csr.offsets.to_numpy(zero_copy_only=True))
+    return Catalog(titles, multi, meta['unparsed_dates'])
+
+
+# Per-process memo: a worker maps each file once, however many figures it builds
+_mapped = {}
+
+
+def mapped_catalog(path):
+    stamp = os.stat(path).st_mtime_ns
+    if _mapped.get('key') != (path, stamp):
+        _mapped.update(key=(path, stamp), catalog=map_catalog(path))
+    return _mapped['catalog']
@@ -0,0 +1,100 @@
+# -------------------------------------
+# ⚙️ Figure Rendering (serial or process pool)
+# -------------------------------------
+# None of the figures depends on another, so in batch mode each one is
+# handed to a worker process running the Agg backend. Workers receive the
+# small aggregate, never the catalog itself. When the aggregation step runs
+# in workers too, they get the path of the memory-mapped catalog
+# (arrowcatalog.py) and map it read-only.
+import gc
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import profiling
+from arrowcatalog import mapped_catalog
+from profiling import stage
+
+
+def use_headless():
+    """Agg backend for matplotlib, whether or not pyplot is imported yet."""
+    os.environ['MPLBACKEND'] = 'Agg'
+    if 'matplotlib' in sys.modules:
+        sys.modules['matplotlib'].use('Agg')
+
+
+def init_worker(profile=False, memory=True):
+    use_headless()
+    # Forked workers inherit the parent's records; report only their own
+    profiling.drain()
+    if profile:
+        profiling.enable(memory)
+
+
+def render_one(figure, data, out_dir, show=False, on_done=None):
+    """Render one figure; returns (path, shared assets the file references)."""
+    path = os.path.join(out_dir, figure.filename)
+    with stage(f'render/{figure.filename}', path=path):
+        assets = figure.render(data, path) or []
+    if on_done:
+        on_done(path)
+
+    # Only matplotlib figures need showing/closing; don't import it for the others.
+    # Closed figures hold reference cycles, so collect them right away to keep
+    # memory flat over long batches.
+    plt = sys.modules.get('matplotlib.pyplot')
+    if plt is not None:
+        if show and plt.get_fignums():
+            plt.show()
+        plt.close('all')
+        gc.collect()
+    return path, assets
+
+
+def render_remote(figure, data, out_dir):
+    """render_one in a worker; also hands its profile records back to the parent."""
+    return render_one(figure, data, out_dir), profiling.drain()
+
+
+def pool_results(futures):
+    results = []
+    for future in futures:
+        result, records = future.result()
+        profiling.extend(records)
+        results.append(result)
+    return results
+
+
+def worker_pool(jobs):
+    return ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                               initargs=(profiling.enabled, profiling.trace_memory))
+
+
+def aggregate_remote(figure, catalog_path):
+    """figure.aggregate over the mapped catalog in a worker; returns (aggregate, profile records)."""
+    with stage(f'aggregate/{figure.filename}'):
+        catalog = mapped_catalog(catalog_path)
+        data = figure.aggregate(catalog)
+    return data, profiling.drain()
+
+
+def aggregate_batch(figures, catalog_path, jobs):
+    """Aggregates of `figures` (in order), computed on `jobs` workers from the mapped catalog."""
+    with worker_pool(jobs) as pool:
+        return pool_results([pool.submit(aggregate_remote, figure, catalog_path) for figure in figures])
+
+
+def render_aggregates(items, out_dir, jobs=1, show=False, on_done=None):
+    """Render (figure, aggregate) pairs, in-process or on `jobs` workers.
+
+    `on_done(path)` is called as each file is written, in completion order.
+    """
+    if jobs > 1:
+        with worker_pool(jobs) as pool:
+            futures = [pool.submit(render_remote, figure, data, out_dir) for figure, data in items]
+            if on_done:
+                for future in as_completed(futures):
+                    on_done(future.result()[0][0])
+            return pool_results(futures)
+    return [render_one(figure, data, out_dir, show, on_done) for figure, data in items]
+
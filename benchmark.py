@@ -0,0 +1,168 @@
+# -------------------------------------
+# ⏱️ Performance Benchmarks
+# -------------------------------------
+# Times every stage of the report against deterministic synthetic
+# catalogs (synthetic.py) and stores the results as JSON baselines:
+#
+#   python benchmark.py --scales 1,10             -> benchmarks/results_<scale>x.json
+#   python benchmark.py --scales 1 --save-baseline -> benchmarks/baseline_1x.json
+#   python benchmark.py --scales 1 --compare      -> ratios against the baseline,
+#                                                    exit code 1 on a regression
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import figures
+from catalog import prepare_catalog
+from cube import DataCube
+from dates import parse_dates
+from schema import read_typed_csv
+from synthetic import ensure_catalog
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+REGRESSION_RATIO = 1.25
+MIN_DELTA = 0.005  # seconds; sub-millisecond stages are too noisy to flag
+
+
+def timed(fn, repeats):
+    """Best wall time of `repeats` runs, and the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def stages(path, out_dir):
+    """(name, callable) pairs in pipeline order; later stages reuse earlier results.
+
+    Render stages are (name, setup, callable): only the callable is timed.
+    """
+    state = {}
+
+    def load():
+        state['df'] = read_typed_csv(path)
+        return state['df']
+
+    def derive():
+        state['catalog'] = prepare_catalog(state['df'])
+        return state['catalog']
+
+    def build_cube():
+        state['cube'] = DataCube.from_catalog(state['catalog'])
+        return state['cube']
+
+    def aggregate(fn):
+        return lambda: fn(state['catalog'])
+
+    def render(filename, output):
+        figure = by_name[filename]
+        setup = lambda: state.__setitem__(filename, figure.aggregate(state['catalog']))
+        return setup, lambda: figure.render(state[filename], os.path.join(out_dir, output))
+
+    by_name = {f.filename: f for f in figures.FIGURES}
+    return [
+        ('load.read_csv_raw', lambda: pd.read_csv(path)),
+        ('load.read_typed_csv', load),
+        ('derive.parse_dates', lambda: parse_dates(state['df']['date_added'])),
+        ('derive.prepare_catalog', derive),
+        ('aggregate.top_genres', aggregate(figures.agg_genres)),
+        ('aggregate.top_countries', aggregate(figures.agg_countries)),
+        ('aggregate.top_actors', aggregate(figures.agg_actors)),
+        ('aggregate.rating_counts', aggregate(figures.agg_ratings)),
+        ('aggregate.type_counts', aggregate(figures.agg_types)),
+        ('aggregate.year_type', aggregate(figures.agg_yearly)),
+        ('aggregate.year_country', aggregate(figures.agg_country_trend)),
+        ('derive.cube', build_cube),
+        ('query.cube_filtered', lambda: state['cube'].query('genre', type='Movie', country='India',
+                                                            years=(2015, 2020))),
+        ('render.matplotlib', *render('Figure_1_Genres.png', 'bench_matplotlib.png')),
+        ('render.altair', *render('Figure_7_Yearly_Additions_With_Dots.html', 'bench_altair.html')),
+        ('render.plotly', *render('Figure_6.1_Global_Choropleth.html', 'bench_plotly.html')),
+    ]
+
+
+def run(scale, repeats, seed=2021):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    warnings.simplefilter(action='ignore', category=FutureWarning)
+
+    path = ensure_catalog(DATA_DIR, scale, seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for name, *steps in stages(path, out_dir):
+            if len(steps) == 2:
+                steps[0]()
+            seconds, _ = timed(steps[-1], repeats)
+            plt.close('all')
+            results[name] = round(seconds, 6)
+            print(f"  {scale:>5}x  {name:<26} {seconds:9.4f}s")
+
+    return {
+        'scale': scale,
+        'seed': seed,
+        'rows': int(round(8807 * scale)),
+        'repeats': repeats,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'stages': results,
+    }
+
+
+def compare(result, baseline, ratio=REGRESSION_RATIO):
+    """Print per-stage ratios; returns the names of the stages that regressed."""
+    regressions = []
+    for name, seconds in result['stages'].items():
+        before = baseline['stages'].get(name)
+        if not before:
+            continue
+        change = seconds / before
+        flag = ''
+        if change > ratio and seconds - before > MIN_DELTA:
+            flag = '  <-- regression'
+            regressions.append(name)
+        print(f"  {name:<26} {before:9.4f}s -> {seconds:9.4f}s  ({change:5.2f}x){flag}")
+    return regressions
+
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as fh:
+        json.dump(payload, fh, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the report stages on synthetic catalogs')
+    parser.add_argument('--scales', default='1,10', help='comma-separated, e.g. 1,10,100,1000')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=2021)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    args = parser.parse_args()
+
+    regressed = []
+    for scale in [int(s) for s in args.scales.split(',')]:
+        # Very large catalogs are timed once
+        result = run(scale, args.repeats if scale <= 10 else 1, args.seed)
+        baseline_path = os.path.join(BENCH_DIR, f'baseline_{scale}x.json')
+        write_json(os.path.join(BENCH_DIR, f'results_{scale}x.json'), result)
+        if args.save_baseline:
+            write_json(baseline_path, result)
+        if args.compare and os.path.exists(baseline_path):
+            with open(baseline_path) as fh:
+                regressed += compare(result, json.load(fh))
+
+    sys.exit(1 if regressed else 0)
@@ -0,0 +1,131 @@
+# -------------------------------------
+# 🗄️ Columnar Cache for netflix_titles.csv
+# -------------------------------------
+# The first run parses the CSV with the typed schema (schema.py) and
+# writes a Parquet copy next to it; later runs read the Parquet copy as
+# long as the CSV fingerprint (size, mtime, content hash) still matches
+# and schema.py, which decides the cached dtypes, is unchanged.
+# `columns` projects the load: only those Parquet columns are read (or, without
+# pyarrow, only those CSV columns are parsed).
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+
+import schema
+from schema import read_typed_csv, typed_columns
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+CACHE_VERSION = 2
+
+
+def content_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(path, previous=None):
+    """Size, mtime and content hash of `path`.
+
+    The content hash is only recomputed when size or mtime differ from
+    `previous`, so an unchanged file costs a single stat() call.
+    """
+    st = os.stat(path)
+    fp = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    if previous and previous.get('size') == fp['size'] and previous.get('mtime_ns') == fp['mtime_ns']:
+        fp['sha256'] = previous['sha256']
+    else:
+        fp['sha256'] = content_hash(path)
+    return fp
+
+
+def csv_fingerprint(path, cache_dir=None):
+    """Fingerprint of `path`, reusing the hash stored in the cache metadata."""
+    _, meta_path = cache_paths(path, cache_dir)
+    meta = read_meta(meta_path)
+    return fingerprint(path, meta and meta.get('fingerprint'))
+
+
+def cache_paths(path, cache_dir=None):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (os.path.join(cache_dir, stem + '.parquet'),
+            os.path.join(cache_dir, stem + '.meta.json'))
+
+
+def schema_digest():
+    """Hash of schema.py: a change to the dtypes or to split_duration invalidates the cache."""
+    return hashlib.sha256(inspect.getsource(schema).encode()).hexdigest()
+
+
+def is_current(meta, fp):
+    """True when cache metadata `meta` was written for this content and schema."""
+    return bool(meta) and meta['fingerprint']['sha256'] == fp['sha256'] and meta.get('schema') == schema_digest()
+
+
+def read_meta(meta_path):
+    try:
+        with open(meta_path) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+
+def load_csv_cached(path, cache_dir=None, verbose=True, columns=None):
+    """Load `path` (or only `columns` of it) through the Parquet cache, refreshing it when the CSV changed."""
+    parquet_path, meta_path = cache_paths(path, cache_dir)
+    meta = read_meta(meta_path)
+
+    start = time.perf_counter()
+    fp = fingerprint(path, meta and meta.get('fingerprint'))
+
+    if HAS_PARQUET and is_current(meta, fp) and os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, columns=columns and typed_columns(columns))
+        elapsed = time.perf_counter() - start
+        if meta['fingerprint'] != fp:
+            # Same content, new mtime: keep the cache, remember the new stat
+            meta['fingerprint'] = fp
+            write_meta(meta_path, meta)
+        if verbose:
+            cold = meta.get('cold_seconds')
+            print(f" Warm start: loaded {os.path.basename(path)} from Parquet cache in {elapsed:.3f}s"
+                  f" (cold CSV parse: {cold:.3f}s)")
+        return df
+
+    # The cache always holds every column, so a cold start parses the whole file once
+    if HAS_PARQUET:
+        df = read_typed_csv(path)
+    else:
+        df = read_typed_csv(path, usecols=columns)
+    elapsed = time.perf_counter() - start
+
+    if HAS_PARQUET:
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        df.to_parquet(parquet_path, index=False)
+        write_meta(meta_path, {'version': CACHE_VERSION, 'fingerprint': fp, 'schema': schema_digest(),
+                               'cold_seconds': elapsed})
+        if columns is not None:
+            df = df[typed_columns(columns)]
+    if verbose:
+        note = 'cache written' if HAS_PARQUET else 'pyarrow missing, cache disabled'
+        print(f" Cold start: parsed {os.path.basename(path)} from CSV in {elapsed:.3f}s ({note})")
+    return df
+
+
+def write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(meta, fh, indent=2)
+    os.replace(tmp_path, meta_path)
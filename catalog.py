@@ -0,0 +1,125 @@
+# -------------------------------------
+# 📚 Catalog Preparation
+# -------------------------------------
+# Every figure reads from one prepared catalog: dates are parsed, the
+# comma-joined columns are split and the derived columns are computed
+# exactly once, here, instead of inside each figure block.
+import numpy as np
+import pandas as pd
+
+from dates import parse_dates
+from multivalue import MultiValueColumn
+from profiling import stage
+
+MULTI_VALUED = ['listed_in', 'country', 'cast', 'director']
+
+month_order = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+title_order = ['Short Title', 'Medium Title', 'Long Title']
+
+# CSV columns each derived column is computed from
+DERIVED_FROM = {
+    'year_added': ['date_added'],
+    'month_added': ['date_added'],
+    'delay': ['date_added', 'release_year'],
+    'title_length_category': ['title'],
+    'duration_minutes': ['duration'],
+    'seasons': ['duration'],
+}
+
+
+def source_columns(columns):
+    """CSV columns needed to provide `columns` (raw or derived), in first-seen order."""
+    needed = []
+    for col in columns:
+        for source in DERIVED_FROM.get(col, [col]):
+            if source not in needed:
+                needed.append(source)
+    return needed
+
+
+def derived_columns(columns):
+    """Raw and derived columns available once the CSV `columns` are loaded."""
+    columns = list(columns)
+    return columns + [col for col, sources in DERIVED_FROM.items() if all(src in columns for src in sources)]
+
+
+def title_length_category(titles):
+    length = titles.fillna('').astype(str).str.len()
+    category = np.select([length < 15, length < 30], ['Short Title', 'Medium Title'], 'Long Title')
+    return pd.Series(pd.Categorical(category, categories=title_order), index=titles.index)
+
+
+class Catalog:
+    """Prepared, shared view of netflix_titles.csv.
+
+    `titles` holds one row per title with the derived columns added;
+    `multi(col)` is the CSR encoding of a multi-valued column (see
+    multivalue.py), which replaces its comma-joined strings in `titles`,
+    and `exploded(col)` materializes its split values, indexed by the
+    title row they came from. Figures must treat all of them as read-only.
+    """
+
+    def __init__(self, titles, multi, unparsed_dates=0):
+        self.titles = titles
+        self._multi = multi
+        self.unparsed_dates = unparsed_dates
+
+    @property
+    def columns(self):
+        """Every column the catalog holds, in `titles` or CSR-encoded."""
+        return [*self.titles.columns, *self._multi]
+
+    def multi(self, column):
+        return self._multi[column]
+
+    def memory_by_column(self):
+        """Bytes per column, the CSR-encoded ones included."""
+        encoded = pd.Series({name: column.memory_usage() for name, column in self._multi.items()}, dtype='int64')
+        return pd.concat([self.titles.memory_usage(index=False, deep=True), encoded])
+
+    def exploded(self, column):
+        return self._multi[column].explode(self.titles.index)
+
+    def subset(self, rows):
+        """Catalog of the title `rows` (a boolean mask or positions), e.g. a filtered view."""
+        rows = np.flatnonzero(rows) if np.asarray(rows).dtype == bool else np.asarray(rows)
+        return Catalog(self.titles.iloc[rows],
+                       {name: column.take(rows) for name, column in self._multi.items()},
+                       self.unparsed_dates)
+
+    def exploded_frame(self, column, with_columns):
+        values = self.exploded(column)
+        frame = self.titles.loc[values.index, list(with_columns)]
+        frame.insert(0, column, values.values)
+        return frame.reset_index(drop=True)
+
+
+def prepare_catalog(df):
+    """Derive what the loaded columns allow; `df` may be a column projection.
+
+    `df` itself is left unchanged; the new frame shares its column data.
+    """
+    multi = {}
+    for col in MULTI_VALUED:
+        if col in df.columns:
+            with stage(f'derive/{col}'):
+                multi[col] = MultiValueColumn.from_series(df[col])
+    # Nothing reads the comma-joined strings once they are encoded
+    titles = df.drop(columns=list(multi))
+    unparsed_dates = 0
+
+    # Each distinct date string is parsed once (see dates.py)
+    if 'date_added' in titles.columns:
+        with stage('derive/date_added'):
+            added, unparsed_dates = parse_dates(titles['date_added'])
+            titles['year_added'] = added.dt.year.astype('Int16')
+            titles['month_added'] = pd.Categorical(added.dt.month_name(), categories=month_order)
+            if 'release_year' in titles.columns:
+                titles['delay'] = titles['year_added'] - titles['release_year']
+    if 'title' in titles.columns:
+        with stage('derive/title_length_category'):
+            titles['title_length_category'] = title_length_category(titles['title'])
+
+    return Catalog(titles, multi, unparsed_dates)
@@ -0,0 +1,56 @@
+# -------------------------------------
+# 🔗 Sparse Co-occurrence
+# -------------------------------------
+# A CSR-encoded multi-valued column (multivalue.py) already is the
+# structure of a sparse one-hot matrix: titles x distinct values. The
+# co-occurrence of two columns is then a single sparse product
+#
+#   C = A.T @ B        C[i, j] = titles listing both value i and value j
+#
+# with no exploded frames and no pairwise Python loops. scipy is imported
+# on first use, so importing this module (figures.py does) stays cheap.
+import numpy as np
+import pandas as pd
+
+
+def one_hot(column, codes=None):
+    """Titles x values 0/1 matrix of a MultiValueColumn, optionally only `codes`."""
+    from scipy import sparse
+    data = np.ones(len(column.codes), dtype=np.int32)
+    # Without copy=True scipy keeps the column's own codes / offsets as its index
+    # arrays, and sum_duplicates() sorts and merges them in place
+    matrix = sparse.csr_matrix((data, column.codes, column.offsets),
+                               shape=(len(column), len(column.dictionary)), copy=True)
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix if codes is None else matrix[:, codes]
+
+
+def top_codes(column, n):
+    counts = column.counts()
+    order = np.argsort(-counts, kind='stable')[:n]
+    return order[counts[order] > 0]
+
+
+def cooccurrence_frame(left, right, names, left_codes=None, right_codes=None):
+    """Non-zero entries of one_hot(left).T @ one_hot(right) as a long frame."""
+    product = (one_hot(left, left_codes).T @ one_hot(right, right_codes)).tocoo()
+    left_labels = left.dictionary if left_codes is None else left.dictionary[left_codes]
+    right_labels = right.dictionary if right_codes is None else right.dictionary[right_codes]
+    return pd.DataFrame({
+        names[0]: np.asarray(left_labels)[product.row],
+        names[1]: np.asarray(right_labels)[product.col],
+        'count': product.data.astype(np.int64),
+    })
+
+
+def top_pairs(frame, n):
+    """The `n` most frequent pairs, ties broken by name."""
+    names = [col for col in frame.columns if col != 'count']
+    ranked = frame.sort_values(['count', *names], ascending=[False, True, True], kind='stable')
+    return ranked.head(n).reset_index(drop=True)
+
+
+def sorted_pairs(frame):
+    names = [col for col in frame.columns if col != 'count']
+    return frame.sort_values(names, kind='stable').reset_index(drop=True)
@@ -0,0 +1,195 @@
+# -------------------------------------
+# 🧊 Sparse OLAP Cube for Cross-Filtering
+# -------------------------------------
+# Every title contributes one cell per (country, genre) pair it lists, on
+# the dimensions (type, rating, year_added, month_added, country, genre).
+# Only non-empty cells are stored. Because country and genre are
+# multi-valued, each cell carries four measures:
+#
+#   n          titles                      exact when country and genre are fixed
+#   w_country  sum of 1 / n_countries      exact summed over all countries
+#   w_genre    sum of 1 / n_genres         exact summed over all genres
+#   w_title    sum of 1 / (n_c * n_g)      exact summed over both
+#
+# so any filter/group-by on the other dimensions is answered with a mask
+# and a bincount over the cells, never a rescan of the titles. Titles with
+# no country (genre) are kept under a missing member so totals stay exact.
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ('type', 'rating', 'year_added', 'month_added', 'country', 'genre')
+MEASURES = ('n', 'w_country', 'w_genre', 'w_title')
+MULTI_DIMENSIONS = ('country', 'genre')
+
+# Titles per block while building, to bound the size of the cross product
+BLOCK_TITLES = 1_000_000
+
+
+def title_members(column):
+    """Deduplicated (row, code) entries per title, with code -1 for titles listing nothing."""
+    size = len(column.dictionary)
+    key = np.unique(column.row_ids().astype(np.int64) * size + column.codes)
+    rows, codes = key // size, key % size
+    empty = np.flatnonzero(np.bincount(rows, minlength=len(column)) == 0)
+    rows = np.concatenate([rows, empty])
+    codes = np.concatenate([codes, np.full(len(empty), -1)])
+    order = np.argsort(rows, kind='stable')
+    lengths = np.bincount(rows, minlength=len(column))
+    return codes[order], np.concatenate([[0], np.cumsum(lengths)]), lengths
+
+
+def reduce_cells(codes, weights, radices):
+    """Sum `weights` over identical cells; codes are -1-based per dimension."""
+    key = np.zeros(len(codes[0]), dtype=np.int64)
+    for dim_codes, radix in zip(codes, radices):
+        key = key * radix + (dim_codes + 1)
+    keys, inverse = np.unique(key, return_inverse=True)
+    summed = [np.bincount(inverse, weights=w, minlength=len(keys)) for w in weights]
+    cells = []
+    for radix in reversed(radices):
+        cells.append(keys % radix - 1)
+        keys = keys // radix
+    return cells[::-1], summed
+
+
+class DataCube:
+
+    def __init__(self, labels, codes, measures):
+        self.labels = labels        # dimension -> pd.Index of members
+        self.codes = codes          # dimension -> member code per cell (-1 = missing)
+        self.measures = measures    # measure -> float64 per cell
+
+    def __len__(self):
+        return len(self.measures['n'])
+
+    @classmethod
+    def empty(cls):
+        return cls({d: pd.Index([]) for d in DIMENSIONS},
+                   {d: np.array([], dtype=np.int64) for d in DIMENSIONS},
+                   {m: np.array([], dtype=np.float64) for m in MEASURES})
+
+    @classmethod
+    def from_catalog(cls, catalog, block_titles=BLOCK_TITLES):
+        titles = catalog.titles
+        labels, row_codes = {}, {}
+        for dim in DIMENSIONS[:4]:
+            codes, uniques = pd.factorize(titles[dim], sort=True)
+            row_codes[dim], labels[dim] = codes, pd.Index(uniques)
+        members = {}
+        for dim, column in zip(MULTI_DIMENSIONS, ('country', 'listed_in')):
+            members[dim] = title_members(catalog.multi(column))
+            labels[dim] = pd.Index(catalog.multi(column).dictionary)
+        radices = [len(labels[d]) + 1 for d in DIMENSIONS]
+
+        cells, sums = [], []
+        for start in range(0, len(titles), block_titles):
+            rows = np.arange(start, min(start + block_titles, len(titles)))
+            (c_codes, c_off, nc), (g_codes, g_off, ng) = members['country'], members['genre']
+            per = nc[rows] * ng[rows]
+            row = np.repeat(rows, per)
+            position = np.arange(per.sum()) - np.repeat(np.cumsum(per) - per, per)
+            country = c_codes[c_off[row] + position // ng[row]]
+            genre = g_codes[g_off[row] + position % ng[row]]
+
+            codes = [row_codes[d][row] for d in DIMENSIONS[:4]] + [country, genre]
+            weights = [np.ones(len(row)), 1.0 / nc[row], 1.0 / ng[row], 1.0 / per.repeat(per)]
+            block_cells, block_sums = reduce_cells(codes, weights, radices)
+            cells.append(block_cells)
+            sums.append(block_sums)
+
+        if not cells:
+            return cls.empty()
+        codes = [np.concatenate([c[i] for c in cells]) for i in range(len(DIMENSIONS))]
+        weights = [np.concatenate([s[i] for s in sums]) for i in range(len(MEASURES))]
+        codes, weights = reduce_cells(codes, weights, radices)
+        return cls(labels, dict(zip(DIMENSIONS, codes)), dict(zip(MEASURES, weights)))
+
+    @classmethod
+    def from_cells(cls, labels, cells):
+        """Cube from a frame of cells (a member or missing per dimension, plus the
+        measures), e.g. computed by a query engine; `labels` fixes the member order."""
+        codes = [labels[d].get_indexer(cells[d].astype(object).where(cells[d].notna(), None))
+                 for d in DIMENSIONS]
+        weights = [cells[m].to_numpy(dtype=np.float64) for m in MEASURES]
+        radices = [len(labels[d]) + 1 for d in DIMENSIONS]
+        codes, weights = reduce_cells(codes, weights, radices)
+        return cls(dict(labels), dict(zip(DIMENSIONS, codes)), dict(zip(MEASURES, weights)))
+
+    def update(self, other):
+        """Merge `other` into this cube (used to fold streamed chunks)."""
+        codes = []
+        for dim in DIMENSIONS:
+            union = self.labels[dim].append(other.labels[dim].difference(self.labels[dim]))
+            remap = np.append(union.get_indexer(other.labels[dim]), -1)  # -1 stays missing
+            codes.append(np.concatenate([self.codes[dim], remap[other.codes[dim]]]))
+            self.labels[dim] = union
+        weights = [np.concatenate([self.measures[m], other.measures[m]]) for m in MEASURES]
+        radices = [len(self.labels[d]) + 1 for d in DIMENSIONS]
+        codes, weights = reduce_cells(codes, weights, radices)
+        self.codes, self.measures = dict(zip(DIMENSIONS, codes)), dict(zip(MEASURES, weights))
+        return self
+
+    # -------------------------------------
+    # Queries
+    # -------------------------------------
+    def mask(self, filters, years=None):
+        """Cells matching `filters` (dimension -> member or list of members) and
+        the inclusive `years` range."""
+        keep = np.ones(len(self), dtype=bool)
+        for dim, members in filters.items():
+            members = members if isinstance(members, (list, tuple, set)) else [members]
+            allowed = np.zeros(len(self.labels[dim]) + 1, dtype=bool)
+            found = self.labels[dim].get_indexer(list(members))
+            allowed[found[found >= 0]] = True
+            keep &= allowed[self.codes[dim]]  # index -1 hits the trailing False
+        if years is not None:
+            year_labels = np.asarray(self.labels['year_added'], dtype=float)
+            allowed = np.append((year_labels >= years[0]) & (year_labels <= years[1]), False)
+            keep &= allowed[self.codes['year_added']]
+        return keep
+
+    def measure_for(self, by, filters):
+        """The measure that counts titles once, given what is grouped and filtered."""
+        free = tuple(d for d in MULTI_DIMENSIONS if d not in by and d not in filters)
+        return {(): 'n', ('country',): 'w_country', ('genre',): 'w_genre',
+                ('country', 'genre'): 'w_title'}[free]
+
+    def query(self, by, years=None, **filters):
+        """Title counts grouped by one dimension (or a tuple of them), e.g.
+
+            cube.query('genre', type='Movie', country='India', years=(2015, 2020))
+
+        Filtering a multi-valued dimension on several members counts a title
+        once per matching member.
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        keep = self.mask(filters, years)
+        for dim in by:
+            keep &= self.codes[dim] >= 0
+        weights = self.measures[self.measure_for(by, filters)][keep]
+
+        sizes = [len(self.labels[d]) for d in by]
+        key = np.zeros(int(keep.sum()), dtype=np.int64)
+        for dim, size in zip(by, sizes):
+            key = key * size + self.codes[dim][keep]
+        totals = np.rint(np.bincount(key, weights=weights, minlength=int(np.prod(sizes)))).astype(np.int64)
+
+        found = np.flatnonzero(totals)
+        if len(by) == 1:
+            index = self.labels[by[0]][found]
+        else:
+            index = pd.MultiIndex.from_arrays(
+                [self.labels[d][c] for d, c in zip(by, np.unravel_index(found, sizes))], names=by)
+        return pd.Series(totals[found], index=index, name='count')
+
+    def frame(self, keep_dims=DIMENSIONS):
+        """Cells as a DataFrame rolled up onto `keep_dims` (members as labels)."""
+        codes = [self.codes[d] for d in keep_dims]
+        radices = [len(self.labels[d]) + 1 for d in keep_dims]
+        codes, weights = reduce_cells(codes, [self.measures[m] for m in MEASURES], radices)
+        data = {}
+        for dim, dim_codes in zip(keep_dims, codes):
+            values = np.append(np.asarray(self.labels[dim], dtype=object), None)
+            data[dim] = values[dim_codes]  # code -1 picks the trailing None
+        data.update(zip(MEASURES, weights))
+        return pd.DataFrame(data)
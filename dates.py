@@ -0,0 +1,40 @@
+# -------------------------------------
+# 📅 Fast date_added Parsing
+# -------------------------------------
+# `date_added` holds a few thousand distinct strings ("September 25, 2021",
+# " August 4, 2017", ...) repeated over millions of rows. Each distinct
+# string is parsed once, with explicit formats instead of per-element
+# inference, and the results are mapped back to the rows by code.
+import numpy as np
+import pandas as pd
+
+KNOWN_FORMATS = ['%B %d, %Y', '%b %d, %Y', '%Y-%m-%d', '%d-%b-%y']
+
+
+def parse_dates(values, formats=KNOWN_FORMATS):
+    """Parse `values` to datetime64; returns (dates, number of unparsed values).
+
+    Missing values stay NaT and are not counted as failures.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=index if index is not None else range(len(codes)),
+                         dtype='datetime64[ns]'), 0
+    uniques = pd.Series(np.asarray(uniques, dtype=object)).astype('string').str.strip()
+
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+    pending = uniques.notna()
+    for fmt in formats:
+        if not pending.any():
+            break
+        attempt = pd.to_datetime(uniques[pending], format=fmt, errors='coerce')
+        parsed[attempt.index] = parsed[attempt.index].fillna(attempt)
+        pending &= parsed.isna()
+
+    # Map back to the rows by code; code -1 marks a missing value
+    valid = codes >= 0
+    safe = np.where(valid, codes, 0)
+    dates = np.where(valid, parsed.to_numpy()[safe], np.datetime64('NaT'))
+    unparsed = int((valid & pending.to_numpy()[safe]).sum())
+    return pd.Series(dates, index=index, dtype='datetime64[ns]'), unparsed
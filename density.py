@@ -0,0 +1,100 @@
+# -------------------------------------
+# 🌫️ Binned Densities
+# -------------------------------------
+# Histograms and kernel density estimates computed from binned counts, so
+# drawing a distribution costs as much as its number of bins, whatever the
+# number of rows behind it:
+#
+#   integer_bins     equal-width bins of whole units (years, minutes), at most max_bins
+#   histogram        weighted counts per bin (np.bincount), 1D or 2D
+#   scott_bandwidth  Scott's rule from the binned mean and variance
+#   fft_kde          Gaussian KDE of a histogram: the counts convolved with
+#                    the kernel sampled on the bin grid (or a `refine`-times
+#                    finer one, for a smooth curve), through a padded FFT
+#
+# The inputs are (value, count) pairs, i.e. already aggregated counts, and
+# counts over the same bins merge by addition.
+import numpy as np
+
+MAX_BINS = 200
+
+
+def integer_bins(lo, hi, max_bins=MAX_BINS):
+    """Edges of equal-width bins of whole units covering the integers lo..hi.
+
+    Bins are centred on the values when they are one unit wide.
+    """
+    lo, hi = int(np.floor(lo)), int(np.ceil(hi))
+    span = hi - lo + 1
+    width = -(-span // max_bins)
+    return lo - 0.5 + width * np.arange(-(-span // width) + 1)
+
+
+def value_bins(values, max_bins=MAX_BINS):
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return integer_bins(0, 0)
+    return integer_bins(values.min(), values.max(), max_bins)
+
+
+def centres(edges, refine=1):
+    """Bin centres, or the centres of each bin's `refine` equal parts."""
+    step = (edges[1] - edges[0]) / refine
+    return edges[0] + step * (np.arange((len(edges) - 1) * refine) + 0.5)
+
+
+def bin_index(values, edges):
+    """Bin of each value over equally spaced `edges` (values outside go to the end bins)."""
+    width = edges[1] - edges[0]
+    index = np.floor((np.asarray(values, dtype=float) - edges[0]) / width).astype(np.intp)
+    return np.clip(index, 0, len(edges) - 2)
+
+
+def histogram(values, edges, weights=None):
+    """Counts (or summed `weights`) of `values` per bin."""
+    return np.bincount(bin_index(values, edges), weights=weights, minlength=len(edges) - 1).astype(float)
+
+
+def histogram2d(x, y, xedges, yedges, weights=None):
+    """Counts (or summed `weights`) per (x bin, y bin); shape (len(xedges) - 1, len(yedges) - 1)."""
+    nx, ny = len(xedges) - 1, len(yedges) - 1
+    cells = bin_index(x, xedges) * ny + bin_index(y, yedges)
+    return np.bincount(cells, weights=weights, minlength=nx * ny).astype(float).reshape(nx, ny)
+
+
+def scott_bandwidth(counts, points):
+    """Scott's rule, n ** -1/5 * standard deviation, for `counts` at `points`."""
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum()
+    if n < 2:
+        return 0.0
+    mean = np.dot(counts, points) / n
+    sd = np.sqrt(np.dot(counts, (points - mean) ** 2) / (n - 1))
+    return sd * n ** -0.2
+
+
+def fft_kde(counts, width, bandwidth, refine=1):
+    """Gaussian KDE of the histogram `counts` (bins `width` apart) at centres(edges, refine).
+
+    Each bin's count sits at its centre; an odd `refine` evaluates the
+    curve at that many points per bin. Scaled to counts per unit, so it
+    integrates to counts.sum() (less what the kernel spreads past either
+    end); multiplied by `width` it overlays the histogram.
+    """
+    counts = np.asarray(counts, dtype=float)
+    if refine > 1:
+        fine = np.zeros(len(counts) * refine)
+        fine[refine // 2::refine] = counts
+        counts, width = fine, width / refine
+    sigma = bandwidth / width
+    if sigma <= 0 or len(counts) < 2:
+        return counts / width
+    reach = int(np.ceil(4 * sigma))
+    offsets = np.arange(-reach, reach + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    kernel /= kernel.sum()
+
+    # Zero padding to the full length makes the circular convolution a linear one
+    size = len(counts) + len(kernel) - 1
+    full = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    return np.clip(full[reach:reach + len(counts)], 0, None) / width
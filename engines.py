@@ -0,0 +1,375 @@
+# -------------------------------------
+# 🏎️ Aggregation Engines (pandas, Polars lazy, DuckDB)
+# -------------------------------------
+# Every figure table is built from the running counts in streaming.Partials
+# by the figure's `fold` step, so the aggregation logic is written once and
+# an engine only has to produce those counts:
+#
+#   pandas  the prepared Catalog and each figure's `aggregate` step (default);
+#           as an engine, Partials.from_catalog over that Catalog
+#   polars  LazyFrame plans over the CSV (or its Parquet cache), multithreaded
+#   duckdb  SQL over the same file in an embedded in-memory database
+#
+# The query engines group straight over the split lists, carrying only the
+# row id and one split column at a time, never an exploded copy of the
+# catalog's other columns. date_added is parsed by dates.py over its
+# distinct strings only, and tie order follows first appearance in the
+# file, so every engine yields identical tables for every figure.
+#
+#   python engines.py netflix_titles.csv   -> time each engine, compare its tables
+import argparse
+import os
+import time
+from collections import Counter
+
+import pandas as pd
+
+from cache import cache_paths, csv_fingerprint, is_current, load_csv_cached, read_meta
+from catalog import month_order, prepare_catalog, source_columns, title_order
+from cube import DIMENSIONS, DataCube
+from dates import parse_dates
+from schema import DURATION_PATTERN
+from streaming import Partials, plain
+
+# Strings pandas.read_csv reads as missing by default; the engines match it
+NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+             '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+SEP = ', '
+
+# Partials field -> (kind, columns); multi-valued columns are split on SEP
+QUERIES = {
+    'genres': ('counts', ['listed_in']), 'countries': ('counts', ['country']),
+    'cast': ('counts', ['cast']), 'types': ('counts', ['type']), 'ratings': ('counts', ['rating']),
+    'months': ('counts', ['month_added']), 'delay': ('counts', ['delay']),
+    'yearly': ('pairs', ['year_added', 'type']), 'country_year': ('pairs', ['year_added', 'country']),
+    'length_type': ('pairs', ['type', 'title_length_category']),
+    'rating_type': ('pairs', ['type', 'rating']),
+    'genre_pairs': ('cooccurrence', ['listed_in', 'listed_in']),
+    'country_genre': ('cooccurrence', ['country', 'listed_in']),
+    'actor_director': ('cooccurrence', ['cast', 'director']),
+    'movie_grid': ('movies', ['type', 'title_length_category', 'release_year', 'year_added', 'duration_minutes']),
+    'cube': ('cube', ['type', 'rating', 'year_added', 'month_added', 'country', 'listed_in']),
+}
+
+MULTI = ('listed_in', 'country', 'cast', 'director')
+
+
+def source_path(path):
+    """The Parquet cache of `path` when it is current (see cache.py), else the CSV."""
+    parquet_path, meta_path = cache_paths(path)
+    meta = read_meta(meta_path)
+    if is_current(meta, csv_fingerprint(path)) and os.path.exists(parquet_path):
+        return parquet_path
+    return path
+
+
+def date_table(distinct):
+    """year_added / month_added of each distinct date_added string, parsed by dates.py."""
+    distinct = pd.Series(distinct, dtype=object).dropna().reset_index(drop=True)
+    added, _ = parse_dates(distinct)
+    month = added.dt.month_name().astype(object)
+    return pd.DataFrame({'date_added': distinct, 'year_added': added.dt.year.astype('Int32'),
+                         'month_added': month.where(month.notna(), None)})
+
+
+def counter(frame):
+    """Counter keyed by every column but the last (a tuple for several), in row order."""
+    keys = [frame[col].tolist() for col in frame.columns[:-1]]
+    keys = keys[0] if len(keys) == 1 else zip(*keys)
+    keys = [tuple(plain(k) for k in key) if isinstance(key, tuple) else plain(key) for key in keys]
+    return Counter(dict(zip(keys, frame[frame.columns[-1]].astype('int64').tolist())))
+
+
+def cube_labels(distinct, first_seen):
+    """Member order of DataCube.from_catalog: sorted plain members, first-seen split members."""
+    labels = {dim: pd.Index(sorted(distinct[dim].dropna().tolist())) for dim in ('type', 'rating')}
+    labels['year_added'] = pd.Index(sorted(int(year) for year in distinct['year_added'].dropna()))
+    months = [m for m in month_order if m in set(distinct['month_added'].dropna())]
+    labels['month_added'] = pd.CategoricalIndex(months, categories=month_order)
+    labels['country'] = pd.Index(first_seen['country'], dtype=object)
+    labels['genre'] = pd.Index(first_seen['listed_in'], dtype=object)
+    return labels
+
+
+class Engine:
+    """Computes the Partials fields with a query engine; subclasses supply the queries.
+
+    Each query returns a pandas frame whose last column is the count, with
+    split-column members in order of first appearance.
+    """
+
+    name = None
+
+    def partials(self, path, fields=None):
+        fields = Partials.FIELDS if fields is None else fields
+        partial = Partials()
+        if not fields:
+            return partial  # e.g. only Figure_13, which reads no column
+        self.open(source_path(path), source_columns(col for f in fields for col in QUERIES[f][1]))
+        for field in fields:
+            kind, columns = QUERIES[field]
+            if kind == 'cube':
+                partial.cube = self.cube()
+            else:
+                setattr(partial, field, counter(getattr(self, kind)(*columns)))
+        return partial
+
+    def cube(self):
+        cells = self.cube_cells()
+        distinct = {dim: self.distinct(dim) for dim in ('type', 'rating', 'year_added', 'month_added')}
+        first_seen = {col: self.counts(col).iloc[:, 0].tolist() for col in ('country', 'listed_in')}
+        return DataCube.from_cells(cube_labels(distinct, first_seen), cells)
+
+
+# -------------------------------------
+# pandas (the prepared Catalog)
+# -------------------------------------
+class PandasEngine(Engine):
+
+    name = 'pandas'
+
+    def partials(self, path, fields=None):
+        fields = Partials.FIELDS if fields is None else fields
+        if not fields:
+            return Partials()
+        columns = source_columns(col for f in fields for col in Partials.INPUTS[f])
+        return Partials.from_catalog(prepare_catalog(load_csv_cached(path, verbose=False, columns=columns)))
+
+
+# -------------------------------------
+# Polars (lazy)
+# -------------------------------------
+class PolarsEngine(Engine):
+
+    name = 'polars'
+
+    def open(self, path, columns):
+        import polars as pl
+        self.pl = pl
+        if path.endswith('.parquet'):
+            frame = pl.scan_parquet(path).select(columns).with_columns(pl.col(c).cast(pl.String) for c in columns)
+        else:
+            frame = pl.scan_csv(path, infer_schema=False, null_values=NA_VALUES).select(columns)
+        frame = frame.with_row_index('row')
+
+        if 'date_added' in columns:
+            distinct = frame.select(pl.col('date_added').unique()).collect().to_series().to_list()
+            dates = pl.from_pandas(date_table(distinct)).with_columns(pl.col('date_added').cast(pl.String))
+            frame = frame.join(dates.lazy(), on='date_added', how='left', maintain_order='left')
+        if 'release_year' in columns:
+            frame = frame.with_columns(pl.col('release_year').cast(pl.Int32, strict=False))
+            if 'date_added' in columns:
+                frame = frame.with_columns(delay=pl.col('year_added') - pl.col('release_year'))
+        if 'duration' in columns:
+            frame = frame.with_columns(
+                duration_minutes=pl.when(pl.col('duration').str.extract(DURATION_PATTERN, 2) == 'min')
+                                   .then(pl.col('duration').str.extract(DURATION_PATTERN, 1).cast(pl.Int32)))
+        if 'title' in columns:
+            length = pl.col('title').str.len_chars().fill_null(0)
+            frame = frame.with_columns(
+                title_length_category=pl.when(length < 15).then(pl.lit(title_order[0]))
+                                        .when(length < 30).then(pl.lit(title_order[1]))
+                                        .otherwise(pl.lit(title_order[2])))
+        # Read and derived once; every query below is a lazy plan over it
+        self.titles = frame.collect().lazy()
+
+    def split(self, column, distinct=False):
+        """(row, member, seq) per listed member; `seq` orders members by first appearance."""
+        pl = self.pl
+        members = (self.titles.select('row', pl.col(column).str.split(SEP))
+                   .explode(column).drop_nulls(column).with_row_index('seq'))
+        return members.unique(['row', column], keep='first', maintain_order=True) if distinct else members
+
+    def column(self, column):
+        pl = self.pl
+        if column in MULTI:
+            return self.split(column)
+        return self.titles.select('row', column).drop_nulls(column).with_columns(seq=pl.col('row'))
+
+    def counts(self, column):
+        pl = self.pl
+        counts = (self.column(column).group_by(column)
+                  .agg(pl.len().alias('count'), pl.col('seq').min()))
+        order = 'seq' if column in MULTI else column
+        return counts.sort(order).select(column, 'count').collect().to_pandas()
+
+    def pairs(self, a, b):
+        pl = self.pl
+        joined = self.column(a).select('row', a).join(self.column(b).select('row', b), on='row')
+        return joined.group_by(a, b).agg(pl.len().alias('count')).collect().to_pandas()
+
+    def cooccurrence(self, a, b):
+        pl = self.pl
+        left = self.split(a, distinct=True).select('row', pl.col(a).alias('_a'))
+        right = self.split(b, distinct=True).select('row', pl.col(b).alias('_b'))
+        counts = left.join(right, on='row').group_by('_a', '_b').agg(pl.len().alias('count'))
+        return counts.collect().to_pandas()
+
+    def movies(self, type_column, *columns):
+        pl = self.pl
+        movies = self.titles.filter(pl.col(type_column) == 'Movie').select(columns).drop_nulls()
+        return movies.group_by(columns).agg(pl.len().alias('count')).collect().to_pandas()
+
+    def distinct(self, column):
+        return self.titles.select(self.pl.col(column).unique()).collect().to_series().to_pandas()
+
+    def cube_cells(self):
+        pl = self.pl
+        dims = ['type', 'rating', 'year_added', 'month_added']
+        cells = self.titles.select('row', *dims)
+        for column, dim, weight in (('country', 'country', 'nc'), ('listed_in', 'genre', 'ng')):
+            members = (self.split(column, distinct=True)
+                       .select('row', pl.col(column).alias(dim), pl.len().over('row').alias(weight)))
+            cells = cells.join(members, on='row', how='left').with_columns(pl.col(weight).fill_null(1))
+        cells = cells.group_by(DIMENSIONS).agg(
+            n=pl.len().cast(pl.Float64), w_country=(1 / pl.col('nc')).sum(),
+            w_genre=(1 / pl.col('ng')).sum(), w_title=(1 / (pl.col('nc') * pl.col('ng'))).sum())
+        return cells.collect().to_pandas()
+
+
+# -------------------------------------
+# DuckDB (SQL)
+# -------------------------------------
+class DuckDBEngine(Engine):
+
+    name = 'duckdb'
+
+    def open(self, path, columns):
+        import duckdb
+        self.con = duckdb.connect()
+        derived = []
+        if 'date_added' in columns:
+            derived.append('d.year_added, d.month_added')
+        if 'release_year' in columns and 'date_added' in columns:
+            derived.append('d.year_added - TRY_CAST(raw.release_year AS INTEGER) AS delay')
+        if 'duration' in columns:
+            derived.append(f"""CASE WHEN regexp_extract(raw.duration, '{DURATION_PATTERN}', 2) = 'min'
+                                    THEN TRY_CAST(regexp_extract(raw.duration, '{DURATION_PATTERN}', 1) AS INTEGER)
+                                    END AS duration_minutes""")
+        if 'title' in columns:
+            derived.append(f"""CASE WHEN length(coalesce(raw.title, '')) < 15 THEN '{title_order[0]}'
+                                    WHEN length(coalesce(raw.title, '')) < 30 THEN '{title_order[1]}'
+                                    ELSE '{title_order[2]}' END AS title_length_category""")
+        selected = ', '.join(f'"{c}"::VARCHAR AS "{c}"' for c in columns)
+        # The path (and the NA strings) are bound, never pasted into the SQL
+        if path.endswith('.parquet'):
+            source, parameters = 'read_parquet(?)', [path]
+        else:
+            source, parameters = 'read_csv(?, header=true, all_varchar=true, nullstr=?)', [path, NA_VALUES]
+        # A table keeps file order, so rowid is the title's row
+        self.con.execute(f"CREATE TABLE raw AS SELECT {selected} FROM {source}", parameters)
+
+        if 'date_added' in columns:
+            distinct = self.con.execute('SELECT DISTINCT date_added FROM raw').df()['date_added']
+            self.con.register('dates', date_table(distinct))
+            joined = 'raw LEFT JOIN dates d ON raw.date_added = d.date_added'
+        else:
+            joined = 'raw'
+        typed = 'raw.* REPLACE (TRY_CAST(raw.release_year AS INTEGER) AS release_year)' \
+            if 'release_year' in columns else 'raw.*'
+        self.con.execute(f"""CREATE TABLE titles AS
+                             SELECT {', '.join(['raw.rowid AS "row"', typed, *derived])} FROM {joined}""")
+
+    def query(self, sql):
+        return self.con.execute(sql).df()
+
+    def split(self, column, distinct=False):
+        """SQL of (row, member, seq) per listed member; `seq` orders by first appearance."""
+        members = f"""
+            SELECT "row", unnest(parts) AS "{column}",
+                   "row" * 65536 + unnest(range(len(parts))) AS seq
+            FROM (SELECT "row", string_split("{column}", '{SEP}') AS parts
+                  FROM titles WHERE "{column}" IS NOT NULL)"""
+        if distinct:
+            members = f"""SELECT "row", "{column}", min(seq) AS seq FROM ({members})
+                          GROUP BY "row", "{column}" """
+        return members
+
+    def column(self, column):
+        if column in MULTI:
+            return self.split(column)
+        return f'SELECT "row", "{column}", "row" AS seq FROM titles WHERE "{column}" IS NOT NULL'
+
+    def counts(self, column):
+        order = 'min(seq)' if column in MULTI else f'"{column}"'
+        return self.query(f"""SELECT "{column}", count(*) AS count FROM ({self.column(column)})
+                              GROUP BY "{column}" ORDER BY {order}""")
+
+    def pairs(self, a, b):
+        return self.query(f"""SELECT l."{a}", r."{b}", count(*) AS count
+                              FROM ({self.column(a)}) l JOIN ({self.column(b)}) r USING ("row")
+                              GROUP BY ALL""")
+
+    def cooccurrence(self, a, b):
+        return self.query(f"""SELECT l."{a}" AS _a, r."{b}" AS _b, count(*) AS count
+                              FROM ({self.split(a, True)}) l JOIN ({self.split(b, True)}) r USING ("row")
+                              GROUP BY ALL""")
+
+    def movies(self, type_column, *columns):
+        selected = ', '.join(f'"{c}"' for c in columns)
+        present = ' AND '.join(f'"{c}" IS NOT NULL' for c in columns)
+        return self.query(f"""SELECT {selected}, count(*) AS count FROM titles
+                              WHERE "{type_column}" = 'Movie' AND {present} GROUP BY ALL""")
+
+    def distinct(self, column):
+        return self.query(f'SELECT DISTINCT "{column}" FROM titles')[column]
+
+    def cube_cells(self):
+        return self.query(f"""
+            WITH c AS ({self.split('country', True)}), g AS ({self.split('listed_in', True)}),
+            cells AS (
+                SELECT t.type, t.rating, t.year_added, t.month_added,
+                       c.country, g.listed_in AS genre,
+                       greatest(count(c.country) OVER (PARTITION BY t."row", g.listed_in), 1) AS nc,
+                       greatest(count(g.listed_in) OVER (PARTITION BY t."row", c.country), 1) AS ng
+                FROM titles t LEFT JOIN c USING ("row") LEFT JOIN g USING ("row"))
+            SELECT type, rating, year_added, month_added, country, genre,
+                   count(*)::DOUBLE AS n, sum(1 / nc) AS w_country, sum(1 / ng) AS w_genre,
+                   sum(1 / (nc * ng)) AS w_title
+            FROM cells GROUP BY ALL""")
+
+
+ENGINES = {'pandas': PandasEngine, 'polars': PolarsEngine, 'duckdb': DuckDBEngine}
+
+
+def engine_partials(engine, path, fields=None):
+    """Partials (only `fields`, if given) computed by the named engine."""
+    return ENGINES[engine]().partials(path, fields)
+
+
+# -------------------------------------
+# Checking the engines against each other
+# -------------------------------------
+def table(data):
+    """Rows of a figure table as plain Python values (dtypes aside), for comparison."""
+    frame = data.reset_index() if isinstance(data, pd.Series) else data.reset_index(drop=True)
+    rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False)
+    return [tuple(plain(v) for v in row) for row in rows]
+
+
+def compare(path, engines=('polars', 'duckdb')):
+    """Time each engine and list the figures whose table differs from the pandas one."""
+    from cache import load_csv_cached
+    from catalog import prepare_catalog
+    from figures import FIGURES
+
+    start = time.perf_counter()
+    catalog = prepare_catalog(load_csv_cached(path, verbose=False))
+    expected = {f.filename: table(f.aggregate(catalog)) for f in FIGURES}
+    print(f" pandas: {time.perf_counter() - start:.2f}s")
+    for engine in engines:
+        start = time.perf_counter()
+        partials = engine_partials(engine, path)
+        tables = {f.filename: table(f.fold(partials)) for f in FIGURES}
+        elapsed = time.perf_counter() - start
+        differ = [name for name, rows in tables.items() if rows != expected[name]]
+        print(f" {engine}: {elapsed:.2f}s, {'identical tables' if not differ else 'differs: ' + ', '.join(differ)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the aggregation engines on a catalog')
+    parser.add_argument('path')
+    parser.add_argument('--engines', default='polars,duckdb')
+    args = parser.parse_args()
+    compare(args.path, args.engines.split(','))
@@ -0,0 +1,954 @@
+# -------------------------------------
+# 📊 Figure Definitions
+# -------------------------------------
+# Each figure is split into an `aggregate` step, which reduces the
+# prepared catalog to the handful of rows the chart needs, and a `render`
+# step, which draws that aggregate and writes the output file. Render
+# steps only ever see the small aggregate, so they can run in worker
+# processes (see batch.py). `fold` builds the same aggregate from the
+# streamed partial counts (see streaming.py).
+#
+# Plotting backends are imported inside the render steps, so a run only
+# pays for matplotlib/seaborn, altair or plotly if it draws with them.
+#
+# A render step may return the names of shared assets it references next
+# to its output (e.g. the plotly.js bundle); the pipeline rebuilds the
+# figure if one of them goes missing.
+import hashlib
+import json
+import os
+import shutil
+import warnings
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from catalog import month_order, title_order
+from cooccurrence import cooccurrence_frame, sorted_pairs, top_codes, top_pairs
+from cube import DataCube
+from streaming import pair_frame, top_counts
+
+# 'shared': one versioned plotly.js per output directory, referenced by relative
+# path (offline, no CDN); 'embed': the full bundle inside every HTML file
+PLOTLY_JS = os.environ.get('REPORT_PLOTLYJS', 'shared')
+
+# Altair data: 'inline' embeds each aggregate in its spec, but writes it as a
+# sidecar JSON file (with a warning) once it exceeds ALTAIR_MAX_INLINE bytes;
+# 'strict' refuses such a spec instead; 'external' always uses sidecar files
+ALTAIR_DATA = os.environ.get('REPORT_ALTAIR_DATA', 'inline')
+ALTAIR_MAX_INLINE = int(os.environ.get('REPORT_ALTAIR_MAX_INLINE', 1_000_000))
+
+# 'inline' bundles the vega/vega-lite/vega-embed scripts into each Altair HTML
+# file (needs vl-convert-python) instead of loading them from a CDN
+ALTAIR_INLINE_JS = os.environ.get('REPORT_ALTAIR_JS', 'cdn') == 'inline'
+
+# Map geometry is fetched by the browser; set these to serve local copies
+# (use_local_geo(), server.py --geo-dir) instead of the plotly / vega-datasets CDNs
+PLOTLY_TOPOJSON_URL = None
+US_TOPOJSON_URL = None
+
+# Topojson files the maps read, and the directory next to the figures
+# that use_local_geo() copies them to
+WORLD_TOPOJSON = 'world_110m.json'
+US_TOPOJSON = 'us-10m.json'
+LOCAL_GEO = 'geo'
+
+
+def render_settings():
+    """The output settings above, read at render time; rendered files depend on them."""
+    return {'plotly_js': PLOTLY_JS, 'altair_data': ALTAIR_DATA, 'altair_max_inline': ALTAIR_MAX_INLINE,
+            'altair_inline_js': ALTAIR_INLINE_JS, 'plotly_topojson_url': PLOTLY_TOPOJSON_URL,
+            'us_topojson_url': US_TOPOJSON_URL}
+
+
+def use_local_geo(geo_dir, out_dir):
+    """Copy the topojson files in `geo_dir` to out_dir/geo/ and point the maps at them.
+
+    Returns the map files `geo_dir` lacks (those maps stay blank offline).
+    """
+    global PLOTLY_TOPOJSON_URL, US_TOPOJSON_URL
+    target = os.path.join(out_dir, LOCAL_GEO)
+    os.makedirs(target, exist_ok=True)
+    for name in os.listdir(geo_dir):
+        if name.endswith('.json'):
+            shutil.copyfile(os.path.join(geo_dir, name), os.path.join(target, name))
+    PLOTLY_TOPOJSON_URL = LOCAL_GEO + '/'
+    US_TOPOJSON_URL = f'{LOCAL_GEO}/{US_TOPOJSON}'
+    return [name for name in (WORLD_TOPOJSON, US_TOPOJSON) if not os.path.exists(os.path.join(geo_dir, name))]
+
+
+def local_geo_assets(url):
+    """[url] when `url` is a topojson file copied next to the figures, else []."""
+    return [url] if url and url.startswith(LOCAL_GEO + '/') else []
+
+
+def altair():
+    """Import altair on first use; altair_data() enforces the size budget instead of max_rows."""
+    import altair as alt
+    alt.data_transformers.disable_max_rows()
+    return alt
+
+
+def altair_data(frame, path, max_inline=None):
+    """Data for an Altair chart saved at `path`: the (already aggregated) frame to
+    inline, or a URL to a sidecar JSON file; returns (data, shared assets).
+
+    Sidecar files are named by content, so a dataset used by several charts in
+    the same directory is written once.
+    """
+    from altair.utils.data import to_values
+    alt = altair()
+    max_inline = max_inline or ALTAIR_MAX_INLINE
+    payload = json.dumps(to_values(frame)['values'], separators=(',', ':'))
+    if ALTAIR_DATA != 'external' and len(payload) <= max_inline:
+        return frame, []
+
+    name = os.path.basename(path)
+    if ALTAIR_DATA == 'strict':
+        raise ValueError(f"{name}: {len(payload):,} bytes of inline data exceeds the "
+                         f"{max_inline:,}-byte budget; aggregate further or use "
+                         f"REPORT_ALTAIR_DATA=external")
+    if ALTAIR_DATA == 'inline':
+        warnings.warn(f"{name}: {len(payload):,} bytes of data exceeds the {max_inline:,}-byte "
+                      f"inline budget; writing it as a sidecar file instead")
+
+    asset = f'altair-data-{hashlib.sha256(payload.encode()).hexdigest()[:16]}.json'
+    asset_path = os.path.join(os.path.dirname(path), asset)
+    if not os.path.exists(asset_path):
+        tmp_path = f'{asset_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(payload)
+        os.replace(tmp_path, asset_path)
+    return alt.UrlData(url=asset, format=alt.DataFormat(type='json')), [asset]
+
+
+def write_plotly_html(fig, path):
+    """Save a plotly figure; returns the shared assets the HTML file references."""
+    config = {'topojsonURL': PLOTLY_TOPOJSON_URL} if PLOTLY_TOPOJSON_URL else None
+    if PLOTLY_JS == 'embed':
+        fig.write_html(path, config=config)
+        return []
+
+    import plotly
+    from plotly.offline import get_plotlyjs
+    asset = f'plotly-{plotly.__version__}.min.js'
+    asset_path = os.path.join(os.path.dirname(path), asset)
+    if not os.path.exists(asset_path):
+        # Workers may race to write it; each writes its own temp file
+        tmp_path = f'{asset_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(get_plotlyjs())
+        os.replace(tmp_path, asset_path)
+    fig.write_html(path, include_plotlyjs=asset, config=config)
+    return [asset]
+
+
+@dataclass(frozen=True)
+class Figure:
+    number: str
+    filename: str
+    aggregate: Callable
+    render: Callable
+    fold: Callable
+    columns: tuple = None  # catalog columns the aggregate reads (raw or derived); None = all
+
+
+# -------------------------------------
+#   Top 10 Genres
+# -------------------------------------
+def agg_genres(catalog):
+    return catalog.multi('listed_in').value_counts().head(10)
+
+
+def fold_genres(partials):
+    return top_counts(partials.genres, 10)
+
+
+def render_genres(top_genres, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(14, 6))
+    sns.barplot(x=top_genres.values, y=top_genres.index, palette="Set2")
+    plt.title('Top 10 Netflix Genres')
+    plt.xlabel('Number of Titles')
+    plt.ylabel('Genre')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+#  Top Producing Countries
+# -------------------------------------
+def agg_countries(catalog):
+    return catalog.multi('country').value_counts().head(10)
+
+
+def fold_countries(partials):
+    return top_counts(partials.countries, 10)
+
+
+def render_countries(top_countries, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(14, 6))
+    sns.barplot(x=top_countries.values, y=top_countries.index, palette="Set3")
+    plt.title('Top 10 Producing Countries on Netflix')
+    plt.xlabel('Number of Titles')
+    plt.ylabel('Country')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+#  Top Actors
+# -------------------------------------
+def agg_actors(catalog):
+    return catalog.multi('cast').value_counts().head(10)
+
+
+def fold_actors(partials):
+    return top_counts(partials.cast, 10)
+
+
+def render_actors(top_actors, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x=top_actors.values, y=top_actors.index, palette='coolwarm')
+    plt.title('Top 10 Most Frequent Actors in Netflix Titles')
+    plt.xlabel('Number of Titles')
+    plt.ylabel('Actor')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+#  Titles Added by Month
+# -------------------------------------
+def agg_months(catalog):
+    return catalog.titles['month_added'].value_counts().reindex(month_order)
+
+
+def fold_months(partials):
+    return top_counts(partials.months).reindex(month_order)
+
+
+def render_months(month_counts, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x=month_counts.index, y=month_counts.values, palette='viridis')
+    plt.title('Titles Added by Month (Seasonality Pattern)')
+    plt.xlabel('Month')
+    plt.ylabel('Number of Titles')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+# Content Type Distribution
+# -------------------------------------
+def agg_types(catalog):
+    return catalog.titles["type"].value_counts()
+
+
+def fold_types(partials):
+    return top_counts(partials.types, by_name=True)
+
+
+def render_types(type_counts, path):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(8, 6))
+    plt.pie(type_counts, labels=type_counts.index, autopct='%1.1f%%', startangle=90,
+            colors=["#ff9999", "#66b3ff"], textprops={'fontsize': 12})
+    plt.title("Distribution of Content Types on Netflix")
+    plt.axis('equal')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+# Content Rating Distribution
+# -------------------------------------
+def agg_ratings(catalog):
+    return catalog.titles['rating'].dropna().value_counts().head(8)
+
+
+def fold_ratings(partials):
+    return top_counts(partials.ratings, 8, by_name=True)
+
+
+def render_ratings(rating_counts, path):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure(figsize=(8, 6))
+    plt.pie(rating_counts, labels=rating_counts.index, autopct='%1.1f%%', startangle=140,
+            colors=sns.color_palette("pastel"), textprops={'fontsize': 11})
+    plt.title("Top 8 Content Ratings Distribution")
+    plt.axis('equal')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# -------------------------------------
+# Global Choropleth of Titles by Country
+# -------------------------------------
+def agg_country_counts(catalog):
+    return country_counts_frame(catalog.multi('country').value_counts())
+
+
+def fold_country_counts(partials):
+    return country_counts_frame(top_counts(partials.countries))
+
+
+def country_counts_frame(counts):
+    country_counts = counts.reset_index()
+    country_counts.columns = ['Country', 'Number of Titles']
+    country_counts['Log Titles'] = country_counts['Number of Titles'].apply(lambda x: round(x**0.5, 2))
+    return country_counts
+
+
+def render_global_choropleth(country_counts, path):
+    import plotly.express as px
+    fig = px.choropleth(
+        country_counts,
+        locations='Country',
+        locationmode='country names',
+        color='Log Titles',
+        hover_name='Country',
+        hover_data={'Number of Titles': True},
+        color_continuous_scale='sunsetdark',
+        title=' Global Distribution of Netflix Titles',
+        height=600
+    )
+    fig.update_geos(showcoastlines=True, projection_type='natural earth')
+    world = PLOTLY_TOPOJSON_URL and PLOTLY_TOPOJSON_URL + WORLD_TOPOJSON
+    return write_plotly_html(fig, path) + local_geo_assets(world)
+
+
+# -------------------------------------
+# Top 25 Countries (Color-Coded)
+# -------------------------------------
+def agg_top25_countries(catalog):
+    top_countries = catalog.multi('country').value_counts().head(25).reset_index()
+    top_countries.columns = ['Country', 'Number of Titles']
+    return top_countries
+
+
+def fold_top25_countries(partials):
+    top_countries = top_counts(partials.countries, 25).reset_index()
+    top_countries.columns = ['Country', 'Number of Titles']
+    return top_countries
+
+
+def render_countries_discrete(top_countries, path):
+    import plotly.express as px
+    fig = px.choropleth(
+        top_countries,
+        locations='Country',
+        locationmode='country names',
+        color='Country',
+        hover_name='Country',
+        hover_data={'Number of Titles': True},
+        title='Top 25 Netflix-Producing Countries (Color-Coded)',
+        height=600
+    )
+    fig.update_geos(showcoastlines=True, projection_type='natural earth')
+    world = PLOTLY_TOPOJSON_URL and PLOTLY_TOPOJSON_URL + WORLD_TOPOJSON
+    return write_plotly_html(fig, path) + local_geo_assets(world)
+
+
+# -------------------------------------
+# Titles Added per Year with Dots
+# -------------------------------------
+def agg_yearly(catalog):
+    df_year = catalog.titles.dropna(subset=['year_added', 'type'])
+    return df_year.groupby(['year_added', 'type'], observed=True).size().reset_index(name='count')
+
+
+def fold_yearly(partials):
+    return pair_frame(partials.yearly, ['year_added', 'type'])
+
+
+def render_yearly(yearly, path):
+    alt = altair()
+    data, assets = altair_data(yearly, path)
+    line = alt.Chart(data).mark_line(strokeWidth=2).encode(
+        x=alt.X('year_added:O', title='Year Added', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('count:Q', title='Number of Titles'),
+        color=alt.Color('type:N', title='Content Type', scale=alt.Scale(scheme='set1'))
+    )
+
+    points = alt.Chart(data).mark_point(filled=True, size=65, shape='circle').encode(
+        x='year_added:O', y='count:Q', color='type:N', tooltip=['year_added:Q', 'type:N', 'count:Q']
+    )
+
+    (line + points).properties(
+        width=720, height=420, title='Netflix Titles Added per Year by Type (with Dots)'
+    ).interactive().save(path, inline=ALTAIR_INLINE_JS)
+    return assets
+
+
+# -------------------------------------
+# Title Additions per Year (Top 5 Countries)
+# -------------------------------------
+def agg_country_trend(catalog):
+    # (year, country) counts straight from the CSR codes, no exploded frame
+    country_year = catalog.multi('country').count_by(catalog.titles['year_added'], 'year_added')
+    return top5_country_trend(country_year)
+
+
+def fold_country_trend(partials):
+    return top5_country_trend(pair_frame(partials.country_year, ['year_added', 'country']))
+
+
+def top5_country_trend(country_year):
+    # Top 5 countries overall
+    totals = country_year.groupby('country', sort=False)['count'].sum().sort_values(ascending=False, kind='stable')
+    top5_countries = totals.nlargest(5).index
+    df_top5 = country_year[country_year['country'].isin(top5_countries)]
+    return df_top5.sort_values(['year_added', 'country'], kind='stable').reset_index(drop=True)
+
+
+def render_country_trend(country_year, path):
+    alt = altair()
+    data, assets = altair_data(country_year, path)
+    chart = alt.Chart(data).mark_line(point=True).encode(
+        x=alt.X('year_added:O', title='Year'),
+        y=alt.Y('count:Q', title='Number of Titles'),
+        color=alt.Color('country:N', title='Country'),
+        tooltip=['year_added:Q', 'country:N', 'count:Q']
+    ).properties(
+        width=700,
+        height=400,
+        title='Netflix Title Additions per Year (Top 5 Countries)'
+    ).interactive()
+
+    chart.save(path, inline=ALTAIR_INLINE_JS)
+    return assets
+
+
+# -------------------------------------
+# Time Between Release and Addition
+# -------------------------------------
+# The aggregate is the delay histogram (years -> titles), which is all the
+# chart needs and can be built from streamed chunks as well. The bars and
+# the KDE curve are both drawn from it (see density.py), so the render
+# handles at most 30 numbers whatever the catalog size.
+def agg_delay(catalog):
+    titles = catalog.titles
+    delay = titles.loc[(titles['delay'] >= 0) & (titles['delay'] < 30), 'delay']
+    return delay.value_counts().sort_index()
+
+
+def fold_delay(partials):
+    delay = top_counts(partials.delay).sort_index()
+    return delay[(delay.index >= 0) & (delay.index < 30)]
+
+
+def draw_delay(delay, alpha=0.5):
+    """Histogram of the delay counts with its binned FFT KDE, in one-year bins."""
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba
+
+    from density import centres, fft_kde, histogram, scott_bandwidth, value_bins
+
+    years = delay.index.to_numpy(dtype=float)
+    edges = value_bins(years)
+    width = edges[1] - edges[0]
+    counts = histogram(years, edges, delay.to_numpy(dtype=float))
+    # Delays are whole years: a kernel narrower than a bin would only trace the bars
+    bandwidth = max(scott_bandwidth(counts, centres(edges)), width)
+    points = centres(edges, 9)
+    kde = fft_kde(counts, width, bandwidth, refine=9) * width
+    shown = (points >= years.min()) & (points <= years.max()) if len(years) else points < 0
+
+    plt.figure(figsize=(10, 6))
+    plt.bar(centres(edges), counts, width=width, color=to_rgba('darkblue', alpha), edgecolor='black', linewidth=1)
+    plt.plot(points[shown], kde[shown], color='darkblue', linewidth=1.5)
+    plt.title('Time Between Content Release and Netflix Addition')
+    plt.xlabel('Years Delay')
+    plt.ylabel('Number of Titles')
+    plt.tight_layout()
+
+
+def render_delay(delay, path):
+    import matplotlib.pyplot as plt
+    draw_delay(delay)
+    plt.savefig(path)
+
+
+# -------------------------------------
+# Title Length vs Content Type
+# -------------------------------------
+def agg_length_vs_type(catalog):
+    return catalog.titles.groupby(['type', 'title_length_category'], observed=True).size().reset_index(name='count')
+
+
+def fold_length_vs_type(partials):
+    source = pair_frame(partials.length_type, ['type', 'title_length_category'])
+    source['title_length_category'] = pd.Categorical(source['title_length_category'], categories=title_order)
+    return source.sort_values(['type', 'title_length_category'], kind='stable').reset_index(drop=True)
+
+
+def render_length_vs_type(source, path):
+    alt = altair()
+    data, assets = altair_data(source, path)
+    alt.Chart(data).mark_bar().encode(
+        x=alt.X('title_length_category:N', sort=title_order, axis=alt.Axis(title='Title Length')),
+        y=alt.Y('count:Q', title='Number of Titles'),
+        color=alt.Color('title_length_category:N', legend=None),
+        tooltip=['title_length_category:N', 'count:Q']
+    ).properties(width=350, height=400).facet(
+        column=alt.Column('type:N', title='Content Type')
+    ).properties(
+        title='Netflix Title Count by Title Length and Content Type'
+    ).save(path, inline=ALTAIR_INLINE_JS)
+    return assets
+
+
+# -------------------------------------
+# Top Ratings by Content Type
+# -------------------------------------
+def agg_rating_vs_type(catalog):
+    df_rated = catalog.titles[['type', 'rating']].dropna()
+    df_rated = df_rated[df_rated['rating'] != 'NR']  # Optional: remove ambiguous ratings
+    top_ratings = df_rated['rating'].value_counts().nlargest(6).index
+    df_filtered = df_rated[df_rated['rating'].isin(top_ratings)]
+    return df_filtered.groupby(['type', 'rating'], observed=True).size().reset_index(name='count')
+
+
+def fold_rating_vs_type(partials):
+    source = pair_frame(partials.rating_type, ['type', 'rating'])
+    source = source[source['rating'] != 'NR']
+    totals = source.groupby('rating', sort=False)['count'].sum().sort_values(ascending=False, kind='stable')
+    return source[source['rating'].isin(totals.nlargest(6).index)].reset_index(drop=True)
+
+
+def render_rating_vs_type(source, path):
+    alt = altair()
+    data, assets = altair_data(source, path)
+    alt.Chart(data).mark_bar().encode(
+        x=alt.X('rating:N', axis=alt.Axis(title='Rating', labelAngle=0)),
+        y=alt.Y('count:Q', title='Number of Titles'),
+        color=alt.Color('rating:N', legend=None),
+        tooltip=['rating:N', 'count:Q']
+    ).properties(width=400, height=400).facet(
+        column=alt.Column('type:N', title=None)
+    ).properties(
+        title='Top Ratings Distribution by Netflix Content Type'
+    ).save(path, inline=ALTAIR_INLINE_JS)
+    return assets
+
+
+# -------------------------------------
+# 🎲 Simulated Netflix Counts for U.S. States
+# -------------------------------------
+us_states = [
+    'Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California', 'Colorado', 'Connecticut',
+    'Delaware', 'Florida', 'Georgia', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa',
+    'Kansas', 'Kentucky', 'Louisiana', 'Maine', 'Maryland', 'Massachusetts', 'Michigan',
+    'Minnesota', 'Mississippi', 'Missouri', 'Montana', 'Nebraska', 'Nevada',
+    'New Hampshire', 'New Jersey', 'New Mexico', 'New York', 'North Carolina',
+    'North Dakota', 'Ohio', 'Oklahoma', 'Oregon', 'Pennsylvania', 'Rhode Island',
+    'South Carolina', 'South Dakota', 'Tennessee', 'Texas', 'Utah', 'Vermont',
+    'Virginia', 'Washington', 'West Virginia', 'Wisconsin', 'Wyoming'
+]
+
+#  Static mapping of state name to FIPS ID
+name_to_fips = {
+    'Alabama': 1, 'Alaska': 2, 'Arizona': 4, 'Arkansas': 5, 'California': 6, 'Colorado': 8,
+    'Connecticut': 9, 'Delaware': 10, 'Florida': 12, 'Georgia': 13, 'Hawaii': 15, 'Idaho': 16,
+    'Illinois': 17, 'Indiana': 18, 'Iowa': 19, 'Kansas': 20, 'Kentucky': 21, 'Louisiana': 22,
+    'Maine': 23, 'Maryland': 24, 'Massachusetts': 25, 'Michigan': 26, 'Minnesota': 27,
+    'Mississippi': 28, 'Missouri': 29, 'Montana': 30, 'Nebraska': 31, 'Nevada': 32,
+    'New Hampshire': 33, 'New Jersey': 34, 'New Mexico': 35, 'New York': 36,
+    'North Carolina': 37, 'North Dakota': 38, 'Ohio': 39, 'Oklahoma': 40, 'Oregon': 41,
+    'Pennsylvania': 42, 'Rhode Island': 44, 'South Carolina': 45, 'South Dakota': 46,
+    'Tennessee': 47, 'Texas': 48, 'Utah': 49, 'Vermont': 50, 'Virginia': 51,
+    'Washington': 53, 'West Virginia': 54, 'Wisconsin': 55, 'Wyoming': 56
+}
+
+
+def agg_us_states(catalog):
+    # Simulated title counts (independent of the catalog)
+    np.random.seed(0)
+    fake_counts = np.random.randint(20, 500, size=len(us_states))
+
+    state_df = pd.DataFrame({'location': us_states, 'count': fake_counts})
+
+    # Assign FIPS ID
+    state_df['id'] = state_df['location'].map(name_to_fips)
+    state_df.dropna(inplace=True)
+    state_df['id'] = state_df['id'].astype(int)
+    return state_df
+
+
+def render_us_choropleth(state_df, path):
+    alt = altair()
+    data, assets = altair_data(state_df, path)
+
+    #  Load U.S. map
+    if US_TOPOJSON_URL:
+        states = alt.topo_feature(US_TOPOJSON_URL, 'states')
+    else:
+        from vega_datasets import data as vg_data
+        states = alt.topo_feature(vg_data.us_10m.url, 'states')
+
+    # Choropleth map
+    chart = alt.Chart(states).mark_geoshape().encode(
+        color=alt.Color('count:Q', title='Simulated Netflix Titles', scale=alt.Scale(scheme='blues')),
+        tooltip=[
+            alt.Tooltip('location:N', title='State'),
+            alt.Tooltip('count:Q', title='Simulated Titles')
+        ]
+    ).transform_lookup(
+        lookup='id',
+        from_=alt.LookupData(data, key='id', fields=['location', 'count'])
+    ).project(
+        type='albersUsa'
+    ).properties(
+        width=600,
+        height=400,
+        title='Simulated Netflix Title Count by U.S. State'
+    )
+
+    chart.save(path, inline=ALTAIR_INLINE_JS)
+    return assets + local_geo_assets(US_TOPOJSON_URL)
+
+
+# -------------------------------------
+# Co-occurrence Heatmaps (sparse A.T @ B, see cooccurrence.py)
+# -------------------------------------
+def render_heatmap(pairs, path, rows, cols, title, xlabel, ylabel, figsize=(12, 9)):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    matrix = pairs.pivot_table(index=rows, columns=cols, values='count', aggfunc='sum', fill_value=0)
+    matrix = matrix.loc[matrix.sum(axis=1).sort_values(ascending=False, kind='stable').index,
+                        matrix.sum(axis=0).sort_values(ascending=False, kind='stable').index]
+    plt.figure(figsize=figsize)
+    sns.heatmap(matrix, cmap='rocket_r', annot=True, fmt='d', linewidths=0.5,
+                cbar_kws={'label': 'Number of Titles'})
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+# Genre x Genre
+def agg_genre_pairs(catalog):
+    genres = catalog.multi('listed_in')
+    top = top_codes(genres, 15)
+    pairs = cooccurrence_frame(genres, genres, ('genre_a', 'genre_b'), top, top)
+    return sorted_pairs(pairs[pairs['genre_a'] != pairs['genre_b']])
+
+
+def fold_genre_pairs(partials):
+    top = set(top_counts(partials.genres, 15).index)
+    pairs = pair_frame(partials.genre_pairs, ['genre_a', 'genre_b'])
+    keep = pairs['genre_a'].isin(top) & pairs['genre_b'].isin(top) & (pairs['genre_a'] != pairs['genre_b'])
+    return sorted_pairs(pairs[keep])
+
+
+def render_genre_pairs(pairs, path):
+    render_heatmap(pairs, path, 'genre_a', 'genre_b', 'Genre Co-occurrence (Top 15 Genres)', 'Genre', 'Genre')
+
+
+# Country x Genre
+def agg_country_genre(catalog):
+    countries, genres = catalog.multi('country'), catalog.multi('listed_in')
+    pairs = cooccurrence_frame(countries, genres, ('country', 'genre'),
+                               top_codes(countries, 15), top_codes(genres, 12))
+    return sorted_pairs(pairs)
+
+
+def fold_country_genre(partials):
+    top_countries = set(top_counts(partials.countries, 15).index)
+    top_genres = set(top_counts(partials.genres, 12).index)
+    pairs = pair_frame(partials.country_genre, ['country', 'genre'])
+    return sorted_pairs(pairs[pairs['country'].isin(top_countries) & pairs['genre'].isin(top_genres)])
+
+
+def render_country_genre(pairs, path):
+    render_heatmap(pairs, path, 'country', 'genre', 'Genres by Producing Country (Top 15 Countries)',
+                   'Genre', 'Country', figsize=(13, 9))
+
+
+# Actor x Director
+def agg_actor_director(catalog):
+    pairs = cooccurrence_frame(catalog.multi('cast'), catalog.multi('director'), ('actor', 'director'))
+    return top_pairs(pairs, 25)
+
+
+def fold_actor_director(partials):
+    return top_pairs(pair_frame(partials.actor_director, ['actor', 'director']), 25)
+
+
+def render_actor_director(pairs, path):
+    render_heatmap(pairs, path, 'actor', 'director', 'Most Frequent Actor-Director Collaborations',
+                   'Director', 'Actor', figsize=(14, 10))
+
+
+# -------------------------------------
+# Movie Pairwise Densities (binned, see density.py)
+# -------------------------------------
+# The pairplot of release year, year added and duration by title length.
+# Instead of one point per movie, the aggregate counts movies per distinct
+# (category, release year, year added, minutes); the render bins those
+# counts into one image per panel and draws the diagonal KDEs from 1D
+# histograms, so its cost depends on the value ranges, not the row count.
+PAIR_HUE = 'title_length_category'
+PAIR_VARIABLES = ['release_year', 'year_added', 'duration_minutes']
+
+
+def agg_movie_pairs(catalog):
+    titles = catalog.titles
+    movies = titles.loc[titles['type'] == 'Movie', [PAIR_HUE, *PAIR_VARIABLES]].dropna()
+    return movies.groupby([PAIR_HUE, *PAIR_VARIABLES], observed=True).size().reset_index(name='count')
+
+
+def fold_movie_pairs(partials):
+    grid = pair_frame(partials.movie_grid, [PAIR_HUE, *PAIR_VARIABLES])
+    grid[PAIR_HUE] = pd.Categorical(grid[PAIR_HUE], categories=title_order)
+    return grid.sort_values([PAIR_HUE, *PAIR_VARIABLES], kind='stable').reset_index(drop=True)
+
+
+def draw_movie_pairs(grid):
+    """Pair grid of the movie counts in `grid`, drawn as density images; returns the figure."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from matplotlib.patches import Patch
+
+    from density import centres, fft_kde, histogram, histogram2d, scott_bandwidth, value_bins
+
+    hues = grid[PAIR_HUE].astype('category').cat.remove_unused_categories()
+    names = list(hues.cat.categories)
+    codes = hues.cat.codes.to_numpy()
+    colors = np.array(sns.color_palette('Set2', len(names)))
+    counts = grid['count'].to_numpy(dtype=float)
+    values = {var: grid[var].to_numpy(dtype=float) for var in PAIR_VARIABLES}
+    edges = {var: value_bins(values[var]) for var in PAIR_VARIABLES}
+
+    with sns.axes_style('ticks'), sns.plotting_context('notebook', font_scale=1.1):
+        size = len(PAIR_VARIABLES)
+        fig, axes = plt.subplots(size, size, figsize=(2.5 * size, 2.5 * size), squeeze=False)
+        for i, row_var in enumerate(PAIR_VARIABLES):
+            for j, col_var in enumerate(PAIR_VARIABLES):
+                ax = axes[i, j]
+                xedges = edges[col_var]
+                if i == j:
+                    # Diagonal: one KDE per category, normalized over all movies
+                    points, width = centres(xedges), xedges[1] - xedges[0]
+                    for h, name in enumerate(names):
+                        hist = histogram(values[col_var][codes == h], xedges, counts[codes == h])
+                        density = fft_kde(hist, width, scott_bandwidth(hist, points)) / max(counts.sum(), 1)
+                        ax.fill_between(points, density, color=colors[h], alpha=0.25, linewidth=0)
+                        ax.plot(points, density, color=colors[h], linewidth=1.5)
+                    ax.set_ylim(bottom=0)
+                    ax.set_yticks([])
+                else:
+                    # Off-diagonal: each cell in its majority category's colour, opacity by log count
+                    yedges = edges[row_var]
+                    stack = np.stack([histogram2d(values[col_var][codes == h], values[row_var][codes == h],
+                                                  xedges, yedges, counts[codes == h])
+                                      for h in range(len(names))]) if names else np.zeros((1, 1, 1))
+                    total = stack.sum(axis=0)
+                    image = np.zeros(total.shape + (4,))
+                    if total.any():
+                        image[..., :3] = colors[stack.argmax(axis=0)] if names else 0
+                        image[..., 3] = np.log1p(total) / np.log1p(total.max())
+                    ax.imshow(image.transpose(1, 0, 2), origin='lower', aspect='auto', interpolation='nearest',
+                              extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]))
+                ax.set_xlim(xedges[0], xedges[-1])
+                ax.set_xlabel(col_var if i == size - 1 else '')
+                ax.set_ylabel(row_var if j == 0 else '')
+                if i < size - 1:
+                    ax.tick_params(labelbottom=False)
+                if 0 < j and i != j:
+                    ax.tick_params(labelleft=False)
+                sns.despine(ax=ax)
+
+        fig.legend(handles=[Patch(color=colors[h], label=name) for h, name in enumerate(names)],
+                   title=PAIR_HUE, loc='center left', bbox_to_anchor=(1.0, 0.5), frameon=False)
+        fig.tight_layout()
+        fig.suptitle('Netflix Movies: Pairwise Plot Colored by Title Length', y=1.02)
+    return fig
+
+
+def render_movie_pairs(grid, path):
+    draw_movie_pairs(grid).savefig(path, bbox_inches='tight')
+
+
+# -------------------------------------
+# Cross-Filter Dashboard (sparse cube, see cube.py)
+# -------------------------------------
+# The chart data is the cube rolled up onto (type, rating, year, country,
+# genre), with countries outside the top 20 folded into 'Other'. Each view
+# picks the cube measure that counts a title once for the current filters,
+# so every interaction is a client-side sum.
+DASHBOARD_COUNTRIES = 20
+
+# The dashboard is its data: keep it in one self-contained file up to this size,
+# since browsers refuse to fetch sidecar files for pages opened from disk
+DASHBOARD_MAX_INLINE = int(os.environ.get('REPORT_DASHBOARD_MAX_INLINE', 25_000_000))
+
+
+def agg_dashboard(catalog):
+    return dashboard_frame(DataCube.from_catalog(catalog))
+
+
+def fold_dashboard(partials):
+    return dashboard_frame(partials.cube)
+
+
+def dashboard_frame(cube, top_countries=DASHBOARD_COUNTRIES):
+    frame = cube.frame(('type', 'rating', 'year_added', 'country', 'genre'))
+    leaders = cube.query('country').sort_values(ascending=False, kind='stable').index[:top_countries]
+    frame.loc[frame['country'].notna() & ~frame['country'].isin(leaders), 'country'] = 'Other'
+    dims = ['type', 'rating', 'year_added', 'country', 'genre']
+    frame = frame.groupby(dims, dropna=False, sort=True).sum().reset_index()
+    frame['year_added'] = frame['year_added'].astype('Int16')
+    return frame.round({'w_country': 6, 'w_genre': 6, 'w_title': 6})
+
+
+def render_dashboard(cells, path):
+    alt = altair()
+    data, assets = altair_data(cells, path, DASHBOARD_MAX_INLINE)
+
+    def options(dim):
+        return ['All', *sorted(v for v in cells[dim].dropna().unique() if v != 'Other')]
+
+    type_sel = alt.param(name='type_sel', value='All',
+                         bind=alt.binding_select(options=options('type'), name='Type '))
+    rating_sel = alt.param(name='rating_sel', value='All',
+                           bind=alt.binding_select(options=options('rating'), name='Rating '))
+    country_sel = alt.param(name='country_sel', value='All',
+                            bind=alt.binding_select(options=options('country'), name='Country '))
+    years = alt.selection_interval(name='years', encodings=['x'])
+
+    def view(*skip):
+        chart = alt.Chart(data)
+        for dim, param in (('type', 'type_sel'), ('rating', 'rating_sel'), ('country', 'country_sel')):
+            if dim not in skip:
+                chart = chart.transform_filter(f"{param} == 'All' || datum.{dim} == {param}")
+        return chart if 'years' in skip else chart.transform_filter(years)
+
+    # Country fixed by the filter -> its genres are summed; otherwise count each title once
+    per_title = "country_sel == 'All' ? datum.w_title : datum.w_genre"
+
+    yearly = view('years').transform_filter('datum.year_added != null').transform_calculate(
+        value=per_title
+    ).transform_aggregate(count='sum(value)', groupby=['year_added', 'type']).transform_calculate(
+        count='round(datum.count)'
+    ).mark_line(point=True).encode(
+        x=alt.X('year_added:Q', title='Year Added', axis=alt.Axis(format='d')),
+        y=alt.Y('count:Q', title='Number of Titles'),
+        color=alt.Color('type:N', title='Content Type', scale=alt.Scale(scheme='set1')),
+        tooltip=['year_added:Q', 'type:N', 'count:Q']
+    ).add_params(years).properties(width=420, height=260, title='Titles Added per Year (drag to filter)')
+
+    def top_bars(chart, dim, title, color):
+        return chart.transform_filter(f'datum.{dim} != null').transform_aggregate(
+            count='sum(value)', groupby=[dim]
+        ).transform_calculate(count='round(datum.count)').transform_filter(
+            f"datum.{dim} != 'Other'"
+        ).transform_window(
+            rank='rank()', sort=[alt.SortField('count', order='descending')]
+        ).transform_filter('datum.rank <= 10').mark_bar(color=color).encode(
+            x=alt.X('count:Q', title='Number of Titles'),
+            y=alt.Y(f'{dim}:N', sort='-x', title=None),
+            tooltip=[f'{dim}:N', 'count:Q']
+        ).properties(width=420, height=260, title=title)
+
+    genres = top_bars(view().transform_calculate(value="country_sel == 'All' ? datum.w_country : datum.n"),
+                      'genre', 'Top 10 Genres', '#66c2a5')
+    countries = top_bars(view('country').transform_calculate(value='datum.w_genre'),
+                         'country', 'Top 10 Countries', '#8da0cb')
+    ratings = top_bars(view('rating').transform_calculate(value=per_title),
+                       'rating', 'Ratings', '#fc8d62')
+
+    alt.vconcat(yearly | ratings, genres | countries).add_params(
+        type_sel, rating_sel, country_sel
+    ).properties(
+        title='Netflix Catalog Cross-Filter Dashboard'
+    ).save(path, inline=ALTAIR_INLINE_JS)
+    return assets
+
+
+# -------------------------------------
+# 🗂️ Figure Registry (in report order)
+# -------------------------------------
+FIGURES = [
+    Figure('Figure_1', 'Figure_1_Genres.png', agg_genres, render_genres, fold_genres,
+           columns=('listed_in',)),
+    Figure('Figure_2', 'Figure_2_Countries.png', agg_countries, render_countries, fold_countries,
+           columns=('country',)),
+    Figure('Figure_3', 'Figure_3_Top_Actors.png', agg_actors, render_actors, fold_actors,
+           columns=('cast',)),
+    Figure('Figure_4', 'Figure_4_Monthly_Additions.png', agg_months, render_months, fold_months,
+           columns=('month_added',)),
+    Figure('Figure_4', 'Figure_4_Type_Distribution.png', agg_types, render_types, fold_types,
+           columns=('type',)),
+    Figure('Figure_5', 'Figure_5_Rating_Distribution.png', agg_ratings, render_ratings, fold_ratings,
+           columns=('rating',)),
+    Figure('Figure_6.1', 'Figure_6.1_Global_Choropleth.html', agg_country_counts, render_global_choropleth, fold_country_counts,
+           columns=('country',)),
+    Figure('Figure_6.2', 'Figure_6.2_Countries_Discrete.html', agg_top25_countries, render_countries_discrete, fold_top25_countries,
+           columns=('country',)),
+    Figure('Figure_7', 'Figure_7_Yearly_Additions_With_Dots.html', agg_yearly, render_yearly, fold_yearly,
+           columns=('year_added', 'type')),
+    Figure('Figure_8', 'Figure_8_Country_Trend.html', agg_country_trend, render_country_trend, fold_country_trend,
+           columns=('country', 'year_added')),
+    Figure('Figure_9', 'Figure_9_Release_Delay.png', agg_delay, render_delay, fold_delay,
+           columns=('delay',)),
+    Figure('Figure_10', 'Figure_10_Global_Choropleth.html', agg_country_counts, render_global_choropleth, fold_country_counts,
+           columns=('country',)),
+    Figure('Figure_11', 'Figure_11_Length_vs_Type.html', agg_length_vs_type, render_length_vs_type, fold_length_vs_type,
+           columns=('type', 'title_length_category')),
+    Figure('Figure_12', 'Figure_12_Rating_vs_Type.html', agg_rating_vs_type, render_rating_vs_type, fold_rating_vs_type,
+           columns=('type', 'rating')),
+    Figure('Figure_13', 'Figure_13_US_Choropleth.html', agg_us_states, render_us_choropleth, agg_us_states,
+           columns=()),
+    Figure('Figure_14', 'Figure_14_Genre_Cooccurrence.png', agg_genre_pairs, render_genre_pairs, fold_genre_pairs,
+           columns=('listed_in',)),
+    Figure('Figure_15', 'Figure_15_Country_Genre.png', agg_country_genre, render_country_genre, fold_country_genre,
+           columns=('country', 'listed_in')),
+    Figure('Figure_16', 'Figure_16_Actor_Director.png', agg_actor_director, render_actor_director, fold_actor_director,
+           columns=('cast', 'director')),
+    Figure('Figure_17', 'Figure_17_Movie_Pairs.png', agg_movie_pairs, render_movie_pairs, fold_movie_pairs,
+           columns=('type', 'title_length_category', 'release_year', 'year_added', 'duration_minutes')),
+    Figure('Dashboard', 'Dashboard_Cross_Filter.html', agg_dashboard, render_dashboard, fold_dashboard,
+           columns=('type', 'rating', 'year_added', 'month_added', 'country', 'listed_in')),
+]
+
+
+def select_figures(figures, only=None, formats=None):
+    """Figures matching `only` (Figure.number or filename stem, e.g. 'Figure_4' or
+    'Figure_4_Type_Distribution') and `formats` (file extensions, e.g. ['png']).
+
+    Raises ValueError for a name or format that matches no figure, and when
+    the two together leave nothing to build.
+    """
+    selected = list(figures)
+    if only:
+        stems = {f.filename: os.path.splitext(f.filename)[0] for f in figures}
+        unknown = [name for name in only if not any(name in (f.number, stems[f.filename]) for f in figures)]
+        if unknown:
+            raise ValueError(f"unknown figure(s): {', '.join(unknown)}")
+        selected = [f for f in selected if f.number in only or stems[f.filename] in only]
+    if formats:
+        produced = {os.path.splitext(f.filename)[1] for f in figures}
+        unknown = [fmt for fmt in formats if '.' + fmt.lower().lstrip('.') not in produced]
+        if unknown:
+            raise ValueError(f"no figure is written as {', '.join(unknown)} "
+                             f"(formats: {', '.join(sorted(ext[1:] for ext in produced))})")
+        extensions = {'.' + fmt.lower().lstrip('.') for fmt in formats}
+        selected = [f for f in selected if os.path.splitext(f.filename)[1] in extensions]
+    if not selected:
+        raise ValueError(f"none of {', '.join(only or [])} is written as {', '.join(formats or [])}")
+    return selected
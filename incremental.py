@@ -0,0 +1,171 @@
+# -------------------------------------
+# 📈 Incremental Aggregates for an Append-Only Catalog
+# -------------------------------------
+# The catalog feed only ever appends titles, so the streaming partials
+# (streaming.py) are persisted together with a high-water mark and each
+# run folds in only the rows added since:
+#
+#   offset      bytes of the CSV already folded; the next run seeks here
+#   tail        hash of the header and the TAIL_BYTES before `offset`,
+#               which catches a rewritten file without re-reading all of it
+#   show_id     highest numeric show_id folded ('s8807' -> 8807); rows at
+#               or below it in the appended bytes are replays and skipped
+#   date_added  latest date_added folded (reported only)
+#
+# A shorter file, a different header or tail, another epsilon or a change
+# to the code that computes the partials triggers one full fold instead.
+# The state lives in the CSV's cache directory (see cache.py) as
+# `<stem>.partials.pkl` plus a small `<stem>.partials.json` with the mark.
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+import catalog
+import cooccurrence
+import cube
+import dates
+import multivalue
+import schema
+import streaming
+import topk
+from cache import cache_paths
+from dates import parse_dates
+from schema import SCHEMA, apply_schema
+from streaming import DEFAULT_CHUNKSIZE, Partials
+
+STATE_VERSION = 1
+TAIL_BYTES = 1 << 16
+
+# Modules whose code shapes the persisted partials
+STATE_MODULES = (schema, dates, multivalue, catalog, cooccurrence, cube, topk, streaming)
+
+
+def code_digest():
+    h = hashlib.sha256(str(STATE_VERSION).encode())
+    for module in STATE_MODULES:
+        h.update(inspect.getsource(module).encode())
+    return h.hexdigest()
+
+
+def state_paths(path, cache_dir=None):
+    parquet_path, _ = cache_paths(path, cache_dir)
+    stem = os.path.splitext(parquet_path)[0]
+    return stem + '.partials.pkl', stem + '.partials.json'
+
+
+def tail_digest(fh, header, offset):
+    """Hash of the header and the last TAIL_BYTES before `offset`."""
+    start = max(len(header), offset - TAIL_BYTES)
+    fh.seek(start)
+    return hashlib.sha256(header + fh.read(offset - start)).hexdigest()
+
+
+def append_mark(path):
+    """Cheap identity of an append-only CSV: its size and tail (no full read)."""
+    with open(path, 'rb') as fh:
+        header = fh.readline()
+        size = os.fstat(fh.fileno()).st_size
+        return f'{size}:{tail_digest(fh, header, size)}'
+
+
+def show_numbers(show_ids):
+    """Numeric suffix of each show_id ('s42' -> 42.0), NaN where there is none."""
+    return pd.to_numeric(show_ids.str.extract(r'(\d+)$', expand=False), errors='coerce').to_numpy(float)
+
+
+def read_mark(meta_path):
+    try:
+        with open(meta_path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def usable_mark(mark, fh, header, size, epsilon):
+    """True when `mark` describes a prefix of the open CSV, folded by this code."""
+    return (mark is not None
+            and mark.get('code') == code_digest()
+            and mark.get('epsilon') == epsilon
+            and mark.get('header') == header.decode('utf-8', 'replace')
+            and mark['offset'] <= size
+            and mark['tail'] == tail_digest(fh, header, mark['offset']))
+
+
+def save_state(pkl_path, meta_path, partials, mark):
+    os.makedirs(os.path.dirname(pkl_path), exist_ok=True)
+    with open(pkl_path + '.tmp', 'wb') as fh:
+        pickle.dump(partials, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(pkl_path + '.tmp', pkl_path)
+    # The mark goes last: it only ever describes a complete pickle
+    with open(meta_path + '.tmp', 'w') as fh:
+        json.dump(mark, fh, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def update_partials(path, chunksize=DEFAULT_CHUNKSIZE, epsilon=None, cache_dir=None, verbose=True):
+    """Partials for every row of `path`, folding only the rows appended since the last call."""
+    start = time.perf_counter()
+    pkl_path, meta_path = state_paths(path, cache_dir)
+    mark = read_mark(meta_path)
+
+    with open(path, 'rb') as fh:
+        header = fh.readline()
+        size = os.fstat(fh.fileno()).st_size
+        if usable_mark(mark, fh, header, size, epsilon) and os.path.exists(pkl_path):
+            with open(pkl_path, 'rb') as state:
+                partials = pickle.load(state)
+            full = False
+        else:
+            partials = Partials(epsilon)
+            mark = {'version': STATE_VERSION, 'code': code_digest(), 'epsilon': epsilon,
+                    'header': header.decode('utf-8', 'replace'), 'offset': len(header),
+                    'show_id': None, 'date_added': None, 'rows': 0}
+            full = True
+        if mark['offset'] == size:
+            if verbose:
+                print(f" Incremental: no new rows in {os.path.basename(path)} "
+                      f"({mark['rows']:,} titles folded)")
+            return partials
+
+        # Rows appended while this runs are folded now and skipped next time by show_id
+        fh.seek(mark['offset'])
+        names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+        high = -np.inf if mark['show_id'] is None else mark['show_id']
+        latest = pd.Timestamp(mark['date_added']) if mark['date_added'] else None
+        new_rows = skipped = 0
+        for chunk in pd.read_csv(fh, names=names, header=None, dtype=SCHEMA, chunksize=chunksize):
+            if 'show_id' in chunk.columns:
+                numbers = show_numbers(chunk['show_id'])
+                replayed = numbers <= high
+                skipped += int(replayed.sum())
+                chunk = chunk[~replayed]
+                high = np.nanmax(np.append(numbers[~replayed], high))
+            if not len(chunk):
+                continue
+            if 'date_added' in chunk.columns:
+                added = parse_dates(chunk['date_added'])[0].max()
+                if not pd.isna(added) and (latest is None or added > latest):
+                    latest = added
+            partials.merge(Partials.from_catalog(catalog.prepare_catalog(apply_schema(chunk))))
+            new_rows += len(chunk)
+        tail = tail_digest(fh, header, size)
+
+    mark.update(offset=size, tail=tail, rows=mark['rows'] + new_rows,
+                show_id=None if np.isinf(high) else float(high),
+                date_added=latest.isoformat() if latest is not None else None)
+    save_state(pkl_path, meta_path, partials, mark)
+
+    if verbose:
+        kind = 'full fold' if full else 'append'
+        note = f", {skipped:,} replayed rows skipped" if skipped else ''
+        print(f" Incremental: {kind} of {new_rows:,} rows of {os.path.basename(path)} in "
+              f"{time.perf_counter() - start:.2f}s ({mark['rows']:,} titles, "
+              f"latest added {mark['date_added']}{note})")
+    return partials
@@ -0,0 +1,113 @@
+# -------------------------------------
+# 🧩 CSR Encoding for Multi-Valued Columns
+# -------------------------------------
+# `cast`, `director`, `country` and `listed_in` hold comma-joined lists.
+# Instead of exploding them into duplicated rows, each column is stored as
+#
+#   dictionary : the distinct values ("United States", "India", ...)
+#   codes      : int32 positions into `dictionary`, all rows back to back
+#   offsets    : row i owns codes[offsets[i]:offsets[i + 1]]
+#
+# Counting, member filters and per-title joins are then NumPy operations
+# on `codes`. Only the distinct cell strings are ever split.
+import numpy as np
+import pandas as pd
+
+
+class MultiValueColumn:
+
+    def __init__(self, name, dictionary, codes, offsets):
+        self.name = name
+        self.dictionary = dictionary
+        self.codes = codes
+        self.offsets = offsets
+
+    @classmethod
+    def from_series(cls, series, sep=', '):
+        row_unique, uniques = pd.factorize(series)
+        if len(uniques) == 0:
+            return cls(series.name, pd.Index([], dtype=object, name=series.name),
+                       np.array([], dtype=np.int32), np.zeros(len(series) + 1, dtype=np.int64))
+        parts = pd.Series(np.asarray(uniques, dtype=object)).str.split(sep)
+        unique_len = parts.str.len().to_numpy(dtype=np.int64)
+        token_codes, dictionary = pd.factorize(parts.explode().to_numpy(dtype=object))
+        unique_offsets = np.concatenate([[0], np.cumsum(unique_len)])
+
+        valid = row_unique >= 0
+        safe = np.where(valid, row_unique, 0)
+        row_len = np.where(valid, unique_len[safe], 0)
+        offsets = np.concatenate([[0], np.cumsum(row_len)]).astype(np.int64)
+
+        # Gather each row's slice of the per-unique token codes
+        starts = np.where(valid, unique_offsets[safe], 0)
+        gather = np.repeat(starts - offsets[:-1], row_len) + np.arange(offsets[-1])
+        codes = token_codes[gather].astype(np.int32)
+        return cls(series.name, pd.Index(dictionary, name=series.name), codes, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def memory_usage(self):
+        """Bytes held by codes, offsets and the dictionary strings."""
+        return self.codes.nbytes + self.offsets.nbytes + self.dictionary.memory_usage(deep=True)
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def row_ids(self):
+        """Title row of every entry in `codes` (the per-title join key)."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def take(self, rows):
+        """Column restricted to the title `rows` (positions, in the given order)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self.lengths[rows]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        gather = np.repeat(self.offsets[rows] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return MultiValueColumn(self.name, self.dictionary, self.codes[gather], offsets)
+
+    # -------------------------------------
+    # Counting & filtering
+    # -------------------------------------
+    def counts(self, entries=None):
+        codes = self.codes if entries is None else self.codes[entries]
+        return np.bincount(codes, minlength=len(self.dictionary))
+
+    def value_counts(self, entries=None):
+        counts = self.counts(entries)
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=self.dictionary[order], name='count')
+
+    def rows_with(self, members):
+        """Boolean mask of the title rows that list at least one of `members`."""
+        mask = np.zeros(len(self), dtype=bool)
+        wanted = np.zeros(len(self.dictionary), dtype=bool)
+        found = self.dictionary.get_indexer(list(members))
+        wanted[found[found >= 0]] = True
+        mask[self.row_ids()[wanted[self.codes]]] = True
+        return mask
+
+    def count_by(self, row_values, value_name):
+        """Counts of (row value, member) pairs, skipping rows whose value is missing.
+
+        `row_values` is one value per title row, e.g. year_added.
+        """
+        row_values = pd.Series(row_values).reset_index(drop=True)
+        value_codes, value_uniques = pd.factorize(row_values)
+        entry_values = value_codes[self.row_ids()]
+        keep = entry_values >= 0
+        key = entry_values[keep].astype(np.int64) * len(self.dictionary) + self.codes[keep]
+        keys, counts = np.unique(key, return_counts=True)
+        return pd.DataFrame({
+            value_name: np.asarray(value_uniques)[keys // len(self.dictionary)],
+            self.name: self.dictionary[keys % len(self.dictionary)],
+            'count': counts,
+        })
+
+    def explode(self, index=None):
+        """Materialize the exploded Series (value per entry, indexed by title row)."""
+        rows = self.row_ids()
+        index = rows if index is None else index[rows]
+        return pd.Series(np.asarray(self.dictionary)[self.codes], index=index, name=self.name)
@@ -0,0 +1,279 @@
+# -------------------------------------
+# 🔁 Incremental Figure Pipeline
+# -------------------------------------
+# Figures are nodes of a small DAG:
+#
+#   load CSV -> derive columns -> aggregate -> render -> write file(s)
+#
+# Every node gets a content hash built from the hashes of its inputs and
+# the source code of every local module the step runs (including the
+# helpers a render step calls and the output settings in figures.py). A
+# figure is only rebuilt when one of those hashes changed, and figures
+# that share the same aggregate and render step (Figure_6.1 and
+# Figure_10) are built once and copied.
+# The hashes are kept in `.pipeline_manifest.json` inside `out_dir`.
+#
+# With `chunksize` set, aggregates are folded from streamed partial counts
+# (streaming.py) instead of a fully loaded catalog; `epsilon` additionally
+# switches the genre/cast top-k to approximate Space-Saving summaries.
+# With `incremental` the partials are persisted and only rows appended to
+# the CSV since the last run are folded in (incremental.py). With `engine`
+# 'polars' or 'duckdb' the same partials are computed by that query engine
+# (engines.py) and the figures are folded from them.
+#
+# With `jobs` > 1 on the in-memory path, the prepared catalog is written
+# once as a memory-mapped Arrow file (arrowcatalog.py) and the aggregates
+# run in the render workers, which map it instead of receiving a copy.
+# The file is kept in the cache directory and reused while its key holds.
+#
+# With profiling enabled (profiling.py) every node is recorded as a stage
+# and the run profile is written next to the figures.
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+import arrowcatalog
+import cache
+import catalog as catalog_module
+import cooccurrence
+import cube
+import dates
+import density
+import engines
+import figures as figures_module
+import incremental as incremental_module
+import multivalue
+import profiling
+import schema
+import streaming
+import topk
+from arrowcatalog import HAS_ARROW, catalog_path, is_current, write_catalog
+from batch import aggregate_batch, render_aggregates
+from cache import csv_fingerprint, fingerprint, load_csv_cached
+from catalog import derived_columns, prepare_catalog, source_columns
+from engines import engine_partials
+from incremental import append_mark, update_partials
+from profiling import stage
+from streaming import DEFAULT_CHUNKSIZE, Partials, stream_partials
+
+MANIFEST = '.pipeline_manifest.json'
+
+# Local modules whose code shapes the loaded / derived catalog, the
+# aggregates computed from it, and the rendered files
+LOAD_MODULES = (cache, schema)
+DERIVE_MODULES = (dates, multivalue, catalog_module)
+AGGREGATE_MODULES = (cooccurrence, cube, topk, streaming, incremental_module, engines, arrowcatalog)
+RENDER_MODULES = (figures_module, density)
+
+
+def digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode() if isinstance(part, str) else part)
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def source_digest(obj):
+    return digest(inspect.getsource(obj))
+
+
+def modules_digest(modules):
+    return digest(*(inspect.getsource(module) for module in modules))
+
+
+def render_digest():
+    """Code and output settings every render step depends on."""
+    return digest(modules_digest(RENDER_MODULES),
+                  json.dumps(figures_module.render_settings(), sort_keys=True))
+
+
+def aggregate_digest(data):
+    """Content hash of an aggregate (Series / DataFrame / anything picklable)."""
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        values = pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes()
+        labels = repr(list(data.columns) if isinstance(data, pd.DataFrame) else data.name)
+        return digest(values, labels, str(data.dtypes))
+    import pickle
+    return digest(pickle.dumps(data))
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def output_is_current(out_dir, filename, entry, key_name, key):
+    """True when the manifest entry matches `key` and the file on disk is untouched."""
+    if not entry or entry.get(key_name) != key:
+        return False
+    path = os.path.join(out_dir, filename)
+    if not os.path.exists(path):
+        return False
+    # Shared assets the file references (e.g. plotly.js) must still be there too
+    if not all(os.path.exists(os.path.join(out_dir, asset)) for asset in entry.get('assets', [])):
+        return False
+    current = fingerprint(path, entry.get('file'))
+    if current['sha256'] != entry['file']['sha256']:
+        return False
+    entry['file'] = current
+    return True
+
+
+def input_columns(figures):
+    """CSV columns the figures' aggregates read, or None if any of them needs all."""
+    if any(figure.columns is None for figure in figures):
+        return None
+    return source_columns(col for figure in figures for col in figure.columns)
+
+
+def plan(figures):
+    """Group figures that share aggregate and render steps into one node."""
+    nodes = {}
+    for figure in figures:
+        nodes.setdefault((figure.aggregate, figure.render), []).append(figure)
+    return list(nodes.values())
+
+
+def build(figures, file_path, out_dir, jobs=1, show=False, verbose=True, chunksize=None,
+          epsilon=None, started=None, incremental=False, engine='pandas'):
+    """Rebuild out-of-date figures; `started` (perf_counter) anchors time-to-first-figure."""
+    if engine != 'pandas' and (chunksize or epsilon or incremental):
+        raise ValueError(f"engine '{engine}' computes exact counts in one pass; it cannot "
+                         f"be combined with chunksize, epsilon or incremental")
+    start = time.perf_counter()
+    started = started or start
+    manifest = load_manifest(out_dir)
+
+    # load -> derive: keyed by the CSV content and the code that parses it.
+    # An append-only feed is identified by its size and tail instead of a full hash.
+    content_key = append_mark(file_path) if incremental else csv_fingerprint(file_path)['sha256']
+    load_key = digest(content_key, str(cache.CACHE_VERSION), modules_digest(LOAD_MODULES))
+    derive_key = digest(load_key, modules_digest(DERIVE_MODULES + AGGREGATE_MODULES))
+    render_code = render_digest()
+
+    # Approximate top-k and incremental folds only exist on the streaming path
+    if (epsilon or incremental) and not chunksize:
+        chunksize = DEFAULT_CHUNKSIZE
+    if epsilon:
+        derive_key = digest(derive_key, f'epsilon={epsilon}')
+    # Engines produce identical tables, so switching one only re-renders on a difference
+    if engine != 'pandas':
+        derive_key = digest(derive_key, f'engine={engine}')
+
+    # Projection pushdown: only the columns the requested figures read are loaded
+    columns = input_columns(figures)
+    prepared = {}
+
+    def get_input():
+        if 'input' not in prepared:
+            if incremental:
+                # The persisted partials cover every figure, so nothing is projected
+                with stage('load+derive/update_partials'):
+                    prepared['input'] = update_partials(file_path, chunksize, epsilon, verbose=verbose)
+            elif engine != 'pandas':
+                # Count everything the loaded columns allow, like the pandas paths do
+                fields = Partials.fields_for(None if columns is None else derived_columns(columns))
+                with stage(f'load+derive/{engine}'):
+                    prepared['input'] = engine_partials(engine, file_path, fields)
+            elif chunksize:
+                with stage('load+derive/stream_partials'):
+                    prepared['input'] = stream_partials(file_path, chunksize, epsilon, columns)
+            else:
+                with stage('load/csv'):
+                    titles = load_csv_cached(file_path, verbose=verbose, columns=columns)
+                with stage('derive/catalog'):
+                    prepared['input'] = prepare_catalog(titles)
+                unparsed = prepared['input'].unparsed_dates
+                if verbose and unparsed:
+                    print(f" Warning: {unparsed} date_added values could not be parsed")
+        return prepared['input']
+
+    def get_shared():
+        """Path of the mapped catalog, written unless a current one is on disk."""
+        path = catalog_path(file_path)
+        if not is_current(path, derive_key, columns):
+            catalog = get_input()
+            with stage('write/catalog.arrow', path=path):
+                write_catalog(catalog, path, derive_key, columns)
+        return path
+
+    folded = chunksize or engine != 'pandas'
+    stale = []
+    for group in plan(figures):
+        head = group[0]
+        aggregate = head.fold if folded else head.aggregate
+        spec_key = digest(derive_key, source_digest(aggregate), source_digest(head.render), render_code)
+
+        # Nothing upstream changed and every output file is intact
+        if not all(output_is_current(out_dir, f.filename, manifest.get(f.filename), 'spec', spec_key)
+                   for f in group):
+            stale.append((group, aggregate, spec_key))
+
+    # aggregate: re-run in workers over the mapped catalog, or here
+    if stale and jobs > 1 and not folded and HAS_ARROW:
+        results = aggregate_batch([group[0] for group, _, _ in stale], get_shared(), jobs)
+    else:
+        results = []
+        for group, aggregate, _ in stale:
+            source = get_input()
+            with stage(f'aggregate/{group[0].filename}'):
+                results.append(aggregate(source))
+
+    to_render, fresh = [], []
+    for (group, _, spec_key), data in zip(stale, results):
+        head = group[0]
+        # cut off early if the aggregate did not change
+        render_key = digest(aggregate_digest(data), source_digest(head.render), render_code)
+        if all(output_is_current(out_dir, f.filename, manifest.get(f.filename), 'render', render_key)
+               for f in group):
+            for f in group:
+                manifest[f.filename]['spec'] = spec_key
+            continue
+
+        to_render.append((head, data))
+        fresh.append((group, spec_key, render_key))
+
+    first = []
+
+    def first_figure(path):
+        if not first:
+            first.append(time.perf_counter() - started)
+            if verbose:
+                print(f" Time to first figure: {first[0]:.2f}s ({os.path.basename(path)})")
+
+    # render -> write
+    rendered = render_aggregates(to_render, out_dir, jobs=jobs, show=show, on_done=first_figure)
+    for (group, spec_key, render_key), (head_path, assets) in zip(fresh, rendered):
+        for f in group:
+            path = os.path.join(out_dir, f.filename)
+            if path != head_path:
+                with stage(f'write/{f.filename}', path=path):
+                    shutil.copyfile(head_path, path)
+            manifest[f.filename] = {'spec': spec_key, 'render': render_key,
+                                    'file': fingerprint(path), 'assets': assets}
+
+    save_manifest(out_dir, manifest)
+    if profiling.enabled:
+        profiling.write_profile(out_dir)
+
+    built = sum(len(group) for group, _, _ in fresh)
+    if verbose:
+        print(f" Pipeline: rebuilt {built} of {len(figures)} figures "
+              f"({len(to_render)} renders) in {time.perf_counter() - start:.2f}s")
+    return [f.filename for group, _, _ in fresh for f in group]
@@ -0,0 +1,116 @@
+# -------------------------------------
+# 🩺 Per-Stage Run Profile
+# -------------------------------------
+# Wrap a stage in `with stage('aggregate/Figure_7'):` to record its wall
+# time, CPU time, peak traced memory and (with path=...) output size.
+# Disabled by default: `stage()` then returns a shared no-op context, so
+# the instrumentation costs one function call per stage.
+#
+#   enable()                       start recording (and tracemalloc)
+#   write_profile(out_dir)         run_profile.json (+ run_profile.trace.json,
+#                                  Trace Event Format for chrome://tracing,
+#                                  Perfetto or speedscope flame graphs)
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+enabled = False
+trace_memory = True
+records = []
+_stack = []
+_NULL = nullcontext()
+
+
+def enable(memory=True):
+    global enabled, trace_memory
+    enabled, trace_memory = True, memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global enabled
+    enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def stage(name, path=None):
+    return _Stage(name, path) if enabled else _NULL
+
+
+class _Stage:
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def __enter__(self):
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.base, self.peak = current, current
+        self.depth = len(_stack)
+        _stack.append(self)
+        self.cpu = time.process_time()
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu
+        _stack.pop()
+        record = {
+            'name': self.name,
+            'pid': os.getpid(),
+            'depth': self.depth,
+            'start': self.wall,  # epoch seconds: comparable across worker processes
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(cpu, 6),
+        }
+        if trace_memory:
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = peak - self.base
+            if _stack:
+                _stack[-1].peak = max(_stack[-1].peak, peak)
+        if self.path and os.path.exists(self.path):
+            record['output_bytes'] = os.path.getsize(self.path)
+        records.append(record)
+        return False
+
+
+def drain():
+    """Return and clear the records of this process (used by worker processes)."""
+    taken = records[:]
+    records.clear()
+    return taken
+
+
+def extend(more):
+    records.extend(more)
+
+
+def trace_events(profile):
+    return [{
+        'name': r['name'], 'ph': 'X', 'pid': r['pid'], 'tid': r['pid'],
+        'ts': r['start'] * 1e6, 'dur': r['wall_seconds'] * 1e6,
+        'args': {k: v for k, v in r.items() if k not in ('name', 'pid', 'start', 'wall_seconds')},
+    } for r in profile]
+
+
+def write_profile(out_dir, trace=True):
+    origin = min((r['start'] for r in records), default=0)
+    profile = [dict(r, start=round(r['start'] - origin, 6))
+               for r in sorted(records, key=lambda r: r['start'])]
+    path = os.path.join(out_dir, 'run_profile.json')
+    with open(path, 'w') as fh:
+        json.dump({'stages': profile}, fh, indent=2)
+    if trace:
+        with open(os.path.join(out_dir, 'run_profile.trace.json'), 'w') as fh:
+            json.dump({'traceEvents': trace_events(profile), 'displayTimeUnit': 'ms'}, fh)
+    return path
@@ -0,0 +1,112 @@
+# -------------------------------------
+# 🧾 Typed Schema for netflix_titles.csv
+# -------------------------------------
+# Reads the catalog with explicit dtypes instead of letting every column
+# default to `object`, and splits `duration` once into typed
+# `duration_minutes` / `seasons` columns.
+#
+#   python schema.py netflix_titles.csv   -> per-column memory report
+#
+# The baseline is pandas' default loader, plain pd.read_csv(). With
+# pandas >= 3 its text columns are already Arrow strings, so the typed
+# frame only wins on the low-cardinality columns; the free text (cast,
+# title, description) stays as large as before. The report also shows
+# what the figures actually hold in memory: the prepared catalog
+# (catalog.py) of only the columns they read, with the multi-valued
+# columns CSR-encoded instead of kept as strings.
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    STRING = 'string[pyarrow]'
+except ImportError:
+    STRING = 'string'
+
+# Low-cardinality columns become categoricals; even `country`, `listed_in`
+# and `date_added` only have a few thousand distinct values.
+SCHEMA = {
+    'show_id': STRING,
+    'type': 'category',
+    'title': STRING,
+    'director': STRING,
+    'cast': STRING,
+    'country': 'category',
+    'date_added': 'category',
+    'release_year': 'Int16',
+    'rating': 'category',
+    'duration': 'category',
+    'listed_in': 'category',
+    'description': STRING,
+}
+
+DURATION_PATTERN = r'^\s*(\d+)\s*(min|Seasons?)\s*$'
+
+# Columns apply_schema() adds next to a CSV column
+SPLIT_COLUMNS = {'duration': ['duration_minutes', 'seasons']}
+
+
+def split_duration(duration):
+    """Return (duration_minutes, seasons) parsed from '90 min' / '2 Seasons'.
+
+    Only the distinct values are parsed; the results are mapped back to
+    the rows through the categorical codes.
+    """
+    duration = duration.astype('category')
+    parts = duration.cat.categories.to_series().astype(str).str.extract(DURATION_PATTERN)
+    amount = pd.to_numeric(parts[0], errors='coerce').to_numpy()
+    is_minutes = (parts[1] == 'min').to_numpy()
+
+    codes = duration.cat.codes.to_numpy()
+    valid = codes >= 0
+    per_row = np.where(valid, amount[np.where(valid, codes, 0)], np.nan)
+    row_is_minutes = np.where(valid, is_minutes[np.where(valid, codes, 0)], False)
+
+    minutes = pd.Series(np.where(row_is_minutes, per_row, np.nan), index=duration.index).astype('Int16')
+    seasons = pd.Series(np.where(~row_is_minutes, per_row, np.nan), index=duration.index).astype('Int8')
+    return minutes, seasons
+
+
+def apply_schema(df):
+    dtypes = {col: dtype for col, dtype in SCHEMA.items() if col in df.columns}
+    df = df.astype(dtypes)
+    if 'duration' in df.columns:
+        df['duration_minutes'], df['seasons'] = split_duration(df['duration'])
+    return df
+
+
+def typed_columns(columns):
+    """The typed-frame columns that hold CSV `columns` (including split-off ones)."""
+    return [typed for col in columns for typed in [col, *SPLIT_COLUMNS.get(col, [])]]
+
+
+def read_typed_csv(path, **kwargs):
+    df = pd.read_csv(path, dtype=SCHEMA, **kwargs)
+    return apply_schema(df)
+
+
+def memory_by_column(df):
+    return df.memory_usage(index=False, deep=True)
+
+
+def memory_report(path, columns=None):
+    """Memory per column of the default and the typed load, plus the prepared catalog of `columns`."""
+    sizes = {'before_MB': memory_by_column(pd.read_csv(path)), 'after_MB': memory_by_column(read_typed_csv(path))}
+    if columns is not None:
+        from catalog import prepare_catalog
+        sizes['report_MB'] = prepare_catalog(read_typed_csv(path, usecols=columns)).memory_by_column()
+    report = (pd.DataFrame(sizes) / 1e6).round(3)
+    report.loc['TOTAL'] = report.sum()
+    report['ratio'] = (report['before_MB'] / report['after_MB']).round(2)
+    if columns is not None:
+        report['report_ratio'] = (report['before_MB'] / report['report_MB']).round(2)
+    return report
+
+
+if __name__ == '__main__':
+    from figures import FIGURES
+    from pipeline import input_columns
+
+    print(memory_report(sys.argv[1], input_columns(FIGURES)).to_string())
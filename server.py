@@ -0,0 +1,323 @@
+# -------------------------------------
+# 🌐 Local Figure Server
+# -------------------------------------
+# Loads and prepares the catalog once, then renders any figure on demand
+# over HTTP, restricted to the titles matching the query string:
+#
+#   /figures/Figure_7?type=Movie&country=India,Japan&year_min=2015&year_max=2020
+#   /cube/genre?type=TV Show&rating=TV-MA           (DataCube counts as JSON)
+#
+# Multi-valued filters (country, genre) keep titles listing any of the
+# given members. Responses are kept in an LRU cache keyed by figure and
+# normalized filters, so repeated requests never touch pandas or the
+# plotting libraries. Nothing is fetched from the network when the
+# Altair scripts are inlined (vl-convert-python) and --geo-dir holds the
+# map topojson (plotly's world_110m.json and friends, us-10m.json).
+#
+#   python server.py --input netflix_titles.csv --port 8050
+import argparse
+import asyncio
+import html
+import json
+import mimetypes
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+import figures
+from batch import render_one, use_headless
+from cache import load_csv_cached
+from catalog import prepare_catalog
+from cube import DataCube
+from figures import FIGURES, select_figures
+
+# Query parameter -> catalog column; year_min / year_max bound year_added
+FILTERS = {'type': 'type', 'rating': 'rating', 'country': 'country', 'genre': 'listed_in'}
+YEAR_FILTERS = ('year_min', 'year_max')
+
+CACHE_SIZE = int(os.environ.get('REPORT_SERVER_CACHE', 256))
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_filters(query):
+    """Normalized, hashable filters from a query string; raises HTTPError(400)."""
+    filters = []
+    for key, values in sorted(parse_qs(query, keep_blank_values=True).items()):
+        members = tuple(sorted({m.strip() for v in values for m in v.split(',') if m.strip()}))
+        if key in YEAR_FILTERS:
+            if len(members) != 1 or not members[0].lstrip('-').isdigit():
+                raise HTTPError(400, f'{key} must be one integer year')
+            members = (int(members[0]),)
+        elif key not in FILTERS:
+            raise HTTPError(400, f"unknown filter '{key}' (use {', '.join([*FILTERS, *YEAR_FILTERS])})")
+        if members:
+            filters.append((key, members))
+    return tuple(filters)
+
+
+def year_range(filters):
+    years = dict(filters)
+    if not any(key in years for key in YEAR_FILTERS):
+        return None
+    return years.get('year_min', (-np.inf,))[0], years.get('year_max', (np.inf,))[0]
+
+
+def filter_rows(catalog, filters):
+    """Boolean mask of the title rows matching `filters`."""
+    titles = catalog.titles
+    keep = np.ones(len(titles), dtype=bool)
+    for key, members in filters:
+        if key in YEAR_FILTERS:
+            continue
+        column = FILTERS[key]
+        if column in ('country', 'listed_in'):
+            keep &= catalog.multi(column).rows_with(members)
+        else:
+            keep &= titles[column].isin(members).to_numpy()
+    years = year_range(filters)
+    if years is not None:
+        added = titles['year_added'].astype('float64').to_numpy()
+        keep &= (added >= years[0]) & (added <= years[1])  # NaN (no date) never matches
+    return keep
+
+
+class LRUCache:
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class FigureServer:
+
+    def __init__(self, catalog, figure_list=FIGURES, cache_size=CACHE_SIZE, geo_dir=None):
+        self.catalog = catalog
+        self.figures = figure_list
+        self.cache = LRUCache(cache_size)
+        self.geo_dir = geo_dir
+        self.asset_dir = tempfile.mkdtemp(prefix='figure-server-')
+        self.assets = set()
+        self.pending = {}
+        self.cube = None
+        # pyplot is not thread-safe: every render runs on this one thread
+        self.renderer = ThreadPoolExecutor(max_workers=1)
+
+    # -------------------------------------
+    # Rendering (on the renderer thread)
+    # -------------------------------------
+    def figure_named(self, name):
+        try:
+            matches = select_figures(self.figures, [name])
+        except ValueError as error:
+            raise HTTPError(404, str(error))
+        if len(matches) > 1:
+            raise HTTPError(404, f"'{name}' is ambiguous: {', '.join(f.filename for f in matches)}")
+        return matches[0]
+
+    def render(self, figure, filters):
+        catalog = self.catalog
+        if filters:
+            rows = filter_rows(catalog, filters)
+            if not rows.any():
+                raise HTTPError(404, 'no titles match the filters')
+            catalog = catalog.subset(rows)
+        data = figure.aggregate(catalog)
+        path, assets = render_one(figure, data, self.asset_dir)
+        with open(path, 'rb') as fh:
+            body = fh.read()
+        return body, assets
+
+    def query_cube(self, by, filters):
+        if self.cube is None:
+            self.cube = DataCube.from_catalog(self.catalog)
+        if by not in self.cube.labels:
+            raise HTTPError(404, f"unknown dimension '{by}' (use {', '.join(self.cube.labels)})")
+        members = {key: list(values) for key, values in filters if key not in YEAR_FILTERS}
+        counts = self.cube.query(by, years=year_range(filters), **members)
+        return json.dumps({str(k): int(v) for k, v in counts.items()}).encode()
+
+    # -------------------------------------
+    # Request handling
+    # -------------------------------------
+    async def cached(self, key, compute):
+        """Cached response for `key`; concurrent misses share one computation."""
+        response = self.cache.get(key)
+        if response is not None:
+            return response, 'hit'
+        if key not in self.pending:
+            loop = asyncio.get_running_loop()
+            self.pending[key] = loop.run_in_executor(self.renderer, compute)
+        try:
+            response = await self.pending[key]
+        finally:
+            self.pending.pop(key, None)
+        self.cache.put(key, response)
+        return response, 'miss'
+
+    async def respond(self, target):
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split('/') if p]
+        if not parts:
+            return (200, 'text/html; charset=utf-8', self.index()), None
+        if len(parts) == 2 and parts[0] == 'figures' and parts[1] in self.assets:
+            return self.static(self.asset_dir, parts[1]), None
+        if len(parts) >= 2 and parts[0] == 'geo' and self.geo_dir:
+            return self.static(self.geo_dir, '/'.join(parts[1:])), None
+
+        filters = parse_filters(url.query)
+        if len(parts) == 2 and parts[0] == 'figures':
+            figure = self.figure_named(parts[1])
+
+            def compute():
+                body, assets = self.render(figure, filters)
+                self.assets.update(assets)
+                content_type = mimetypes.guess_type(figure.filename)[0] or 'application/octet-stream'
+                return 200, content_type, body
+
+            return await self.cached((figure.filename, filters), compute)
+        if len(parts) == 2 and parts[0] == 'cube':
+            by = parts[1]
+            return await self.cached(('cube', by, filters),
+                                     lambda: (200, 'application/json', self.query_cube(by, filters)))
+        raise HTTPError(404, f'no route for {url.path}')
+
+    def static(self, directory, name):
+        path = os.path.realpath(os.path.join(directory, name))
+        if not path.startswith(os.path.realpath(directory) + os.sep) or not os.path.isfile(path):
+            raise HTTPError(404, f'no such file: {name}')
+        with open(path, 'rb') as fh:
+            body = fh.read()
+        return 200, mimetypes.guess_type(path)[0] or 'application/octet-stream', body
+
+    def index(self):
+        rows = ''.join(
+            f'<li><a href="/figures/{html.escape(os.path.splitext(f.filename)[0])}">'
+            f'{html.escape(f.filename)}</a></li>' for f in self.figures)
+        filters = ', '.join([*FILTERS, *YEAR_FILTERS])
+        return (f'<!doctype html><title>Netflix figures</title><h1>Netflix figures</h1>'
+                f'<p>{len(self.catalog.titles):,} titles. Filters: {filters} '
+                f'(comma-separated lists), e.g. <code>?type=Movie&amp;year_min=2018</code></p>'
+                f'<ul>{rows}</ul>').encode()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                start = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                cache_state = None
+                try:
+                    if method not in ('GET', 'HEAD'):
+                        raise HTTPError(405, f'{method} not allowed')
+                    (status, content_type, body), cache_state = await self.respond(target)
+                except HTTPError as error:
+                    status, content_type, body = error.status, 'text/plain; charset=utf-8', f'{error}\n'.encode()
+                except Exception as error:
+                    status, content_type, body = 500, 'text/plain; charset=utf-8', f'{error!r}\n'.encode()
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+                head = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+                        f'Content-Type: {content_type}',
+                        f'Content-Length: {len(body)}',
+                        f'Connection: {"keep-alive" if keep_alive else "close"}',
+                        f'Server-Timing: total;dur={(time.perf_counter() - start) * 1e3:.2f}']
+                if cache_state:
+                    head.append(f'X-Cache: {cache_state}')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def configure_offline(geo_dir=None):
+    """Point the figures at local copies of everything they would fetch."""
+    try:
+        import vl_convert  # noqa: F401  (lets Altair inline its scripts)
+        figures.ALTAIR_INLINE_JS = True
+    except ImportError:
+        print(' vl-convert-python is not installed: Altair figures load vega from the CDN')
+    if geo_dir:
+        figures.PLOTLY_TOPOJSON_URL = '/geo/'
+        figures.US_TOPOJSON_URL = '/geo/us-10m.json'
+    else:
+        print(' No --geo-dir: choropleth maps fetch their topojson from the CDN')
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f' Serving {len(server.figures)} figures on http://{host}:{port}/')
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the Netflix catalog figures over HTTP')
+    parser.add_argument('--input', default=os.environ.get('REPORT_INPUT', 'netflix_titles.csv'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='responses kept (default: %(default)s)')
+    parser.add_argument('--geo-dir', help='directory of topojson files served under /geo/')
+    args = parser.parse_args(argv)
+
+    use_headless()
+    configure_offline(args.geo_dir)
+    catalog = prepare_catalog(load_csv_cached(args.input))
+    server = FigureServer(catalog, cache_size=args.cache_size, geo_dir=args.geo_dir)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
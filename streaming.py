@@ -0,0 +1,162 @@
+# -------------------------------------
+# 🌊 Chunked Streaming Aggregation
+# -------------------------------------
+# The figures only need running counts, so the catalog can be read in
+# chunks and each chunk folded into mergeable partial aggregates. Peak
+# memory is bounded by the chunk size (plus the number of distinct keys),
+# not by the size of the file.
+#
+# With `epsilon` set, genre and cast counts are kept in Space-Saving
+# summaries (topk.py) so the number of counters stays bounded as well.
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from catalog import prepare_catalog
+from cooccurrence import cooccurrence_frame
+from cube import DataCube
+from schema import SCHEMA, apply_schema
+from topk import SpaceSaving
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def value_counts(values):
+    """Counter of a Series or a MultiValueColumn, keys in order of first appearance.
+
+    Counter.update() keeps existing keys in place and appends new ones, so
+    merged chunk counters stay in order of first appearance in the file,
+    whatever the chunk boundaries.
+    """
+    if isinstance(values, pd.Series):
+        codes, uniques = pd.factorize(values)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    else:
+        # The CSR dictionary already is in order of first appearance
+        uniques, counts = values.dictionary, values.counts()
+    return Counter({plain(k): int(v) for k, v in zip(uniques, counts) if v})
+
+
+def pair_counts(frame, columns, weights=None):
+    grouped = frame.dropna(subset=columns).groupby(columns, observed=True)
+    counts = grouped[weights].sum() if weights else grouped.size()
+    return Counter({tuple(plain(k) for k in key): int(v) for key, v in counts.items() if v})
+
+
+class Partials:
+    """Mergeable running counts behind Figure_1 ... Figure_12.
+
+    Single keys: genres, countries, cast, types, ratings, months, delay.
+    Pair keys:   yearly (year, type), country_year (year, country),
+                 length_type (type, length category), rating_type (type, rating),
+                 genre_pairs, country_genre, actor_director (co-occurrences).
+    Movies:      movie_grid (title length, release year, year added, minutes) of movies.
+    Cube:        cube (DataCube behind the cross-filter dashboard).
+    """
+
+    FIELDS = ('genres', 'countries', 'cast', 'types', 'ratings', 'months', 'delay',
+              'yearly', 'country_year', 'length_type', 'rating_type',
+              'genre_pairs', 'country_genre', 'actor_director', 'movie_grid', 'cube')
+
+    # Countries stay exact: the choropleths need every country's count
+    APPROX_FIELDS = ('genres', 'cast')
+
+    def __init__(self, epsilon=None):
+        for field in self.FIELDS:
+            setattr(self, field, Counter())
+        self.cube = DataCube.empty()
+        if epsilon:
+            for field in self.APPROX_FIELDS:
+                setattr(self, field, SpaceSaving.for_error(epsilon))
+
+    # Columns (raw or derived, see catalog.DERIVED_FROM) each field is counted from
+    INPUTS = {
+        'genres': ['listed_in'], 'countries': ['country'], 'cast': ['cast'],
+        'types': ['type'], 'ratings': ['rating'], 'months': ['month_added'], 'delay': ['delay'],
+        'yearly': ['year_added', 'type'], 'country_year': ['country', 'year_added'],
+        'length_type': ['type', 'title_length_category'], 'rating_type': ['type', 'rating'],
+        'genre_pairs': ['listed_in'], 'country_genre': ['country', 'listed_in'],
+        'actor_director': ['cast', 'director'],
+        'movie_grid': ['type', 'title_length_category', 'release_year', 'year_added', 'duration_minutes'],
+        'cube': ['type', 'rating', 'year_added', 'month_added', 'country', 'listed_in'],
+    }
+
+    @classmethod
+    def fields_for(cls, columns=None):
+        """Fields countable from `columns` (raw or derived); every field for None."""
+        return [field for field in cls.FIELDS
+                if columns is None or all(col in columns for col in cls.INPUTS[field])]
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Count every field whose input columns were loaded; the rest stay empty."""
+        titles = catalog.titles
+        multi = catalog.multi
+        counters = {
+            'genres': lambda: value_counts(multi('listed_in')),
+            'countries': lambda: value_counts(multi('country')),
+            'cast': lambda: value_counts(multi('cast')),
+            'types': lambda: value_counts(titles['type']),
+            'ratings': lambda: value_counts(titles['rating']),
+            'months': lambda: value_counts(titles['month_added']),
+            'delay': lambda: value_counts(titles['delay']),
+            'yearly': lambda: pair_counts(titles, ['year_added', 'type']),
+            'country_year': lambda: pair_counts(multi('country').count_by(titles['year_added'], 'year_added'),
+                                                ['year_added', 'country'], weights='count'),
+            'length_type': lambda: pair_counts(titles, ['type', 'title_length_category']),
+            'rating_type': lambda: pair_counts(titles, ['type', 'rating']),
+            'genre_pairs': lambda: pair_counts(
+                cooccurrence_frame(multi('listed_in'), multi('listed_in'), ('genre_a', 'genre_b')),
+                ['genre_a', 'genre_b'], weights='count'),
+            'country_genre': lambda: pair_counts(
+                cooccurrence_frame(multi('country'), multi('listed_in'), ('country', 'genre')),
+                ['country', 'genre'], weights='count'),
+            'actor_director': lambda: pair_counts(
+                cooccurrence_frame(multi('cast'), multi('director'), ('actor', 'director')),
+                ['actor', 'director'], weights='count'),
+            'movie_grid': lambda: pair_counts(titles[titles['type'] == 'Movie'], cls.INPUTS['movie_grid'][1:]),
+            'cube': lambda: DataCube.from_catalog(catalog),
+        }
+
+        partial = cls()
+        for field, count in counters.items():
+            if all(col in catalog.columns for col in cls.INPUTS[field]):
+                setattr(partial, field, count())
+        return partial
+
+    def merge(self, other):
+        for field in self.FIELDS:
+            getattr(self, field).update(getattr(other, field))
+        return self
+
+
+def stream_partials(path, chunksize=DEFAULT_CHUNKSIZE, epsilon=None, columns=None, **read_kwargs):
+    """Fold `path` (only the CSV `columns`, if given) chunk by chunk into a single Partials."""
+    total = Partials(epsilon)
+    for chunk in pd.read_csv(path, dtype=SCHEMA, chunksize=chunksize, usecols=columns, **read_kwargs):
+        total.merge(Partials.from_catalog(prepare_catalog(apply_schema(chunk))))
+    return total
+
+
+# -------------------------------------
+# Helpers to turn partials into figure inputs
+# -------------------------------------
+def top_counts(counter, n=None, by_name=False):
+    """The `n` largest counts. Ties keep the counter's order (first appearance, as in
+    MultiValueColumn.value_counts), or go by name (the order of a categorical column)."""
+    if by_name:
+        top = sorted(counter.most_common(), key=lambda item: (-item[1], item[0]))[:n]
+    else:
+        top = counter.most_common(n)
+    return pd.Series(dict(top), name='count', dtype='int64')
+
+
+def pair_frame(counter, columns, name='count'):
+    rows = [(*key, count) for key, count in counter.items()]
+    frame = pd.DataFrame(rows, columns=[*columns, name])
+    return frame.sort_values(columns, kind='stable').reset_index(drop=True)
@@ -0,0 +1,164 @@
+# -------------------------------------
+# 🧪 Synthetic Netflix Catalog Generator
+# -------------------------------------
+# Deterministic stand-in for netflix_titles.csv at any multiple of its
+# size (1x = 8,807 titles). Column distributions follow the Kaggle file:
+# ~70% movies, TV-MA/TV-14 dominated ratings, US/India/UK-heavy countries,
+# 1-3 genres per title, long-tailed cast and directors, titles added
+# mostly 2017-2021, and the same missing-value rates and leading-space
+# date_added quirk.
+#
+#   python synthetic.py 10 netflix_synthetic_10x.csv
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_ROWS = 8807
+CHUNK_ROWS = 250_000
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June',
+          'July', 'August', 'September', 'October', 'November', 'December']
+
+RATINGS = {'TV-MA': .364, 'TV-14': .245, 'TV-PG': .098, 'R': .091, 'PG-13': .056, 'TV-Y7': .039,
+           'TV-Y': .035, 'PG': .033, 'TV-G': .025, 'NR': .009, 'G': .005}
+
+COUNTRIES = {'United States': .36, 'India': .10, 'United Kingdom': .08, 'Canada': .045, 'France': .04,
+             'Japan': .03, 'Spain': .025, 'South Korea': .025, 'Germany': .022, 'Mexico': .017,
+             'China': .016, 'Australia': .015, 'Egypt': .012, 'Turkey': .011, 'Hong Kong': .01,
+             'Nigeria': .01, 'Italy': .01, 'Brazil': .01, 'Argentina': .009, 'Belgium': .009,
+             'Indonesia': .009, 'Taiwan': .009, 'Philippines': .008, 'Thailand': .007,
+             'South Africa': .006, 'Colombia': .005, 'Netherlands': .005, 'Denmark': .005,
+             'Ireland': .005, 'Sweden': .004, 'Poland': .004, 'Norway': .003, 'Israel': .003,
+             'Chile': .003, 'Russia': .003, 'Lebanon': .003, 'Pakistan': .002, 'Malaysia': .002}
+
+MOVIE_GENRES = {'International Movies': .20, 'Dramas': .18, 'Comedies': .13, 'Documentaries': .07,
+                'Action & Adventure': .07, 'Independent Movies': .06, 'Children & Family Movies': .05,
+                'Romantic Movies': .05, 'Thrillers': .045, 'Music & Musicals': .03, 'Horror Movies': .03,
+                'Stand-Up Comedy': .025, 'Sci-Fi & Fantasy': .02, 'Sports Movies': .01,
+                'Classic Movies': .008, 'LGBTQ Movies': .006, 'Anime Features': .006, 'Cult Movies': .005,
+                'Faith & Spirituality': .004}
+
+TV_GENRES = {'International TV Shows': .22, 'TV Dramas': .13, 'TV Comedies': .10, 'Crime TV Shows': .08,
+             "Kids' TV": .08, 'Docuseries': .07, 'Romantic TV Shows': .06, 'Reality TV': .04,
+             'British TV Shows': .04, 'Anime Series': .03, 'Spanish-Language TV Shows': .03,
+             'TV Action & Adventure': .03, 'Korean TV Shows': .025, 'TV Mysteries': .017,
+             'Science & Nature TV': .015, 'TV Sci-Fi & Fantasy': .014, 'TV Horror': .013,
+             'Teen TV Shows': .011, 'TV Thrillers': .009, 'Stand-Up Comedy & Talk Shows': .009,
+             'Classic & Cult TV': .004}
+
+YEARS_ADDED = {2008: 2, 2009: 2, 2010: 1, 2011: 13, 2012: 3, 2013: 11, 2014: 24, 2015: 82,
+               2016: 429, 2017: 1188, 2018: 1649, 2019: 2016, 2020: 1879, 2021: 1498}
+
+WORDS = ('love life night day world story man girl last dark city time home war king secret '
+         'family little dream house heart blood black lost wild new road summer the of a in').split()
+
+
+def weighted(rng, table, size):
+    keys = np.array(list(table))
+    p = np.array(list(table.values()), dtype=float)
+    return keys[rng.choice(len(keys), size=size, p=p / p.sum())]
+
+
+def people(rng, prefix, pool, size, a=0.8, shift=10):
+    # Power-law popularity: the busiest actor appears in well under 1% of titles
+    weights = 1.0 / (np.arange(1, pool + 1) + shift) ** a
+    cdf = np.cumsum(weights) / weights.sum()
+    ranks = np.searchsorted(cdf, rng.random(size)) + 1
+    return np.char.add(prefix, ranks.astype(str))
+
+
+def join_lists(values, lengths, sep=', '):
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    values = values.tolist()
+    return [sep.join(values[offsets[i]:offsets[i + 1]]) if lengths[i] else None
+            for i in range(len(lengths))]
+
+
+def multi_valued(rng, draw, n, max_len, p_len, p_missing):
+    lengths = rng.choice(np.arange(1, max_len + 1), size=n, p=p_len)
+    lengths[rng.random(n) < p_missing] = 0
+    rows = np.repeat(np.arange(n), lengths)
+    values = draw(len(rows)).astype(object)
+    # A title lists each member once: redraw repeats within a row until none are left
+    while True:
+        repeated = pd.DataFrame({'row': rows, 'value': values}).duplicated().to_numpy()
+        if not repeated.any():
+            return join_lists(values, lengths)
+        values[repeated] = draw(int(repeated.sum()))
+
+
+def generate_chunk(rng, start, n, scale):
+    is_movie = rng.random(n) < 0.696
+    added_year = weighted(rng, YEARS_ADDED, n).astype(int)
+    release_year = np.clip(added_year - rng.gamma(0.6, 8.0, n).astype(int), 1925, 2021)
+
+    date_added = np.char.add(np.char.add(np.array(MONTHS)[rng.integers(0, 12, n)], ' '),
+                             rng.integers(1, 29, n).astype(str))
+    date_added = np.char.add(np.char.add(date_added, ', '), added_year.astype(str)).astype(object)
+    leading = (~is_movie) & (rng.random(n) < 0.03)
+    date_added[leading] = ' ' + date_added[leading]
+    date_added[rng.random(n) < 0.0011] = None
+
+    minutes = np.clip(rng.normal(100, 28, n), 3, 312).astype(int)
+    seasons = np.where(rng.random(n) < 0.67, 1, rng.integers(2, 10, n))
+    duration = np.where(is_movie, np.char.add(minutes.astype(str), ' min'),
+                        np.char.add(seasons.astype(str), np.where(seasons == 1, ' Season', ' Seasons')))
+
+    movie_genres = multi_valued(rng, lambda k: weighted(rng, MOVIE_GENRES, k), n, 3, [.3, .4, .3], 0)
+    tv_genres = multi_valued(rng, lambda k: weighted(rng, TV_GENRES, k), n, 3, [.25, .4, .35], 0)
+    listed_in = np.where(is_movie, movie_genres, tv_genres)
+
+    # Distinct people grow with the catalog, but slower than the row count
+    actor_pool = int(36_000 * scale ** 0.7)
+    director_pool = int(4_500 * scale ** 0.7)
+
+    title_words = rng.integers(1, 6, n)
+    return pd.DataFrame({
+        'show_id': np.char.add('s', np.arange(start + 1, start + n + 1).astype(str)),
+        'type': np.where(is_movie, 'Movie', 'TV Show'),
+        'title': [s.title() for s in join_lists(rng.choice(WORDS, int(title_words.sum())), title_words, ' ')],
+        'director': multi_valued(rng, lambda k: people(rng, 'Director ', director_pool, k),
+                                 n, 2, [.93, .07], 0.30),
+        'cast': multi_valued(rng, lambda k: people(rng, 'Actor ', actor_pool, k),
+                             n, 12, np.full(12, 1 / 12), 0.094),
+        'country': multi_valued(rng, lambda k: weighted(rng, COUNTRIES, k), n, 3, [.85, .1, .05], 0.094),
+        'date_added': date_added,
+        'release_year': release_year,
+        'rating': np.where(rng.random(n) < 0.0005, None, weighted(rng, RATINGS, n)),
+        'duration': duration,
+        'listed_in': listed_in,
+        'description': [s.capitalize() + '.' for s in
+                        join_lists(rng.choice(WORDS, 24 * n), np.full(n, 24), ' ')],
+    })
+
+
+def generate(path, scale=1, seed=2021):
+    """Write a catalog of `scale` x 8,807 rows to `path`; same seed, same file."""
+    rows = int(round(BASE_ROWS * scale))
+    tmp_path = path + '.tmp'
+    for chunk_index, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        rng = np.random.default_rng([seed, chunk_index])
+        chunk = generate_chunk(rng, start, min(CHUNK_ROWS, rows - start), scale)
+        chunk.to_csv(tmp_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure_catalog(directory, scale, seed=2021):
+    """Path of the synthetic catalog for `scale`, generating it on first use."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'netflix_synthetic_{scale}x_seed{seed}.csv')
+    if not os.path.exists(path):
+        generate(path, scale, seed)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic netflix_titles.csv')
+    parser.add_argument('scale', type=float, help='multiple of the 8,807-title reference catalog')
+    parser.add_argument('path')
+    parser.add_argument('--seed', type=int, default=2021)
+    args = parser.parse_args()
+    generate(args.path, args.scale, args.seed)
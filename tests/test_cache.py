@@ -0,0 +1,30 @@
+import cache
+from cache import load_csv_cached
+
+CSV = """show_id,type,title,duration,release_year
+s1,Movie,A,90 min,2019
+s2,TV Show,B,2 Seasons,2020
+"""
+
+
+def load(path, capsys):
+    df = load_csv_cached(str(path))
+    return df, capsys.readouterr().out
+
+
+def test_cache_is_reused_until_the_schema_changes(tmp_path, capsys, monkeypatch):
+    path = tmp_path / 'titles.csv'
+    path.write_text(CSV)
+
+    cold, out = load(path, capsys)
+    assert 'Cold start' in out
+    warm, out = load(path, capsys)
+    assert 'Warm start' in out
+    assert warm.dtypes.equals(cold.dtypes)
+
+    # Another schema.py: the Parquet copy may hold other dtypes, so it is rebuilt
+    monkeypatch.setattr(cache, 'schema_digest', lambda: 'edited')
+    _, out = load(path, capsys)
+    assert 'Cold start' in out
+    _, out = load(path, capsys)
+    assert 'Warm start' in out
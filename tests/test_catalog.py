@@ -0,0 +1,18 @@
+import numpy as np
+
+from catalog import MULTI_VALUED, prepare_catalog
+from schema import apply_schema
+from streaming import Partials
+from synthetic import generate_chunk
+
+
+def test_multi_valued_columns_are_only_kept_encoded():
+    df = apply_schema(generate_chunk(np.random.default_rng(0), 0, 200, 1))
+    original = df.copy()
+    catalog = prepare_catalog(df)
+
+    assert not set(MULTI_VALUED) & set(catalog.titles.columns)
+    assert set(MULTI_VALUED) <= set(catalog.columns)
+    assert df.equals(original)
+    genres = Partials.from_catalog(catalog).genres
+    assert sum(genres.values()) == len(catalog.multi('listed_in').codes)
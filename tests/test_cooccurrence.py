@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from cooccurrence import cooccurrence_frame, one_hot
+from multivalue import MultiValueColumn
+
+
+def column(values, name='listed_in'):
+    return MultiValueColumn.from_series(pd.Series(values, name=name, dtype=object))
+
+
+def snapshot(col):
+    return col.codes.copy(), col.offsets.copy()
+
+
+def test_one_hot_leaves_column_untouched():
+    # Unsorted members and a repeated member: scipy sorts and merges them
+    col = column(['Dramas, Comedies', 'Comedies, Dramas, Comedies', None, 'Dramas'])
+    codes, offsets = snapshot(col)
+    matrix = one_hot(col)
+    assert np.array_equal(col.codes, codes)
+    assert np.array_equal(col.offsets, offsets)
+    assert matrix.toarray().tolist() == [[1, 1], [1, 1], [0, 0], [1, 0]]
+
+
+def test_cooccurrence_frame_leaves_columns_untouched():
+    genres = column(['Dramas, Comedies', 'Comedies, Dramas, Comedies', 'Dramas'])
+    countries = column(['India, France', 'France', 'France, India, France'], name='country')
+    before = snapshot(genres), snapshot(countries)
+
+    first = cooccurrence_frame(countries, genres, ('country', 'genre'))
+    after = snapshot(genres), snapshot(countries)
+    for (codes, offsets), (new_codes, new_offsets) in zip(before, after):
+        assert np.array_equal(codes, new_codes)
+        assert np.array_equal(offsets, new_offsets)
+
+    # A second product over the same columns sees the same data
+    second = cooccurrence_frame(countries, genres, ('country', 'genre'))
+    pd.testing.assert_frame_equal(first, second)
+    counts = {(c, g): n for c, g, n in first.itertuples(index=False)}
+    assert counts == {('India', 'Dramas'): 2, ('India', 'Comedies'): 1,
+                      ('France', 'Dramas'): 3, ('France', 'Comedies'): 2}
+
+
+def test_genre_cooccurrence_counts_each_title_once():
+    genres = column(['Dramas, Comedies, Dramas', 'Comedies'])
+    pairs = cooccurrence_frame(genres, genres, ('genre_a', 'genre_b'))
+    counts = {(a, b): n for a, b, n in pairs.itertuples(index=False)}
+    assert counts == {('Dramas', 'Dramas'): 1, ('Dramas', 'Comedies'): 1,
+                      ('Comedies', 'Dramas'): 1, ('Comedies', 'Comedies'): 2}
@@ -0,0 +1,15 @@
+import pytest
+
+from figures import FIGURES, select_figures
+
+
+def test_formats_filter_the_named_figures():
+    selected = select_figures(FIGURES, ['Figure_7', 'Figure_1'], ['PNG'])
+    assert [f.number for f in selected] == ['Figure_1']
+
+
+def test_selections_that_build_nothing_are_rejected():
+    with pytest.raises(ValueError, match='svg'):
+        select_figures(FIGURES, formats=['svg'])
+    with pytest.raises(ValueError, match='Figure_7'):
+        select_figures(FIGURES, ['Figure_7'], ['png'])
@@ -0,0 +1,11 @@
+import pandas as pd
+
+from multivalue import MultiValueColumn
+
+
+def test_rows_with_any_of_the_members():
+    column = MultiValueColumn.from_series(
+        pd.Series(['India, Japan', None, 'Chile', 'Japan', 'Poland, Chile'], name='country'))
+    assert column.rows_with(['Japan']).tolist() == [True, False, False, True, False]
+    assert column.rows_with(['Chile', 'Nowhere']).tolist() == [False, False, True, False, True]
+    assert not column.rows_with(['Nowhere']).any()
@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+
+from catalog import prepare_catalog
+from figures import FIGURES
+from schema import apply_schema
+from streaming import Partials, stream_partials, top_counts
+from synthetic import generate_chunk
+
+# Every country and rating appears exactly twice, so the top-k is all ties
+CSV = """show_id,type,title,country,rating
+s1,Movie,A,"Poland, Ireland",TV-MA
+s2,Movie,B,Chile,PG
+s3,TV Show,C,"Ireland, Chile",TV-MA
+s4,Movie,D,Poland,PG
+"""
+
+
+def partials(chunksize):
+    return stream_partials(io.StringIO(CSV), chunksize)
+
+
+def test_ties_follow_first_appearance_for_any_chunking():
+    for chunksize in (1, 2, 3, 100):
+        countries = top_counts(partials(chunksize).countries)
+        assert countries.index.tolist() == ['Poland', 'Ireland', 'Chile']
+        assert top_counts(partials(chunksize).countries, 2).index.tolist() == ['Poland', 'Ireland']
+
+
+def test_ties_by_name_for_categorical_columns():
+    for chunksize in (1, 2, 100):
+        ratings = top_counts(partials(chunksize).ratings, by_name=True)
+        assert ratings.index.tolist() == ['PG', 'TV-MA']
+
+
+class RecordingPartials(Partials):
+    """Partials that remember which fields were read."""
+
+    def __getattribute__(self, name):
+        if name in Partials.FIELDS:
+            object.__getattribute__(self, 'read').add(name)
+        return object.__getattribute__(self, name)
+
+
+def test_folds_read_only_the_fields_their_columns_imply():
+    titles = apply_schema(generate_chunk(np.random.default_rng(0), 0, 500, 1))
+    full = Partials.from_catalog(prepare_catalog(titles))
+    for figure in FIGURES:
+        partials = RecordingPartials()
+        partials.__dict__.update(full.__dict__, read=set())
+        figure.fold(partials)
+        assert partials.read <= set(Partials.fields_for(figure.columns)), figure.number
@@ -0,0 +1,12 @@
+import numpy as np
+import pandas as pd
+
+from synthetic import generate_chunk
+
+
+def test_list_columns_never_repeat_a_member():
+    chunk = generate_chunk(np.random.default_rng(0), 0, 5000, 1)
+    for column in ['director', 'cast', 'country', 'listed_in']:
+        members = chunk[column].dropna().str.split(', ')
+        assert (members.str.len() == members.map(lambda m: len(set(m)))).all(), column
+    assert pd.Series(chunk['show_id']).is_unique
@@ -0,0 +1,172 @@
+# -------------------------------------
+# 🔝 Approximate Top-k (Space-Saving)
+# -------------------------------------
+# Figure_1, Figure_2 and Figure_3 only show the ten most frequent genres,
+# countries and actors. A Space-Saving summary finds them while keeping
+# at most `capacity` counters, instead of a count for every distinct actor.
+#
+# Guarantees for a summary of capacity m = ceil(1 / epsilon) over N items:
+#   * every reported count over-estimates the true count by at most
+#     `error[item]` <= N / m = epsilon * N
+#   * any item with true count > epsilon * N is monitored
+#
+#   python topk.py netflix_titles.csv --epsilon 0.001 -k 10
+#     -> divergence of the approximate ranking from the exact one
+import argparse
+import heapq
+import math
+
+import pandas as pd
+
+
+class SpaceSaving:
+    """Weighted Space-Saving summary; merges with counts or other summaries.
+
+    `update()` accepts a mapping of exact counts (e.g. one chunk's
+    value_counts) or another SpaceSaving, so it can stand in for the
+    Counters held by streaming.Partials.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self.heap = []
+
+    @classmethod
+    def for_error(cls, epsilon):
+        return cls(math.ceil(1 / epsilon))
+
+    @property
+    def epsilon(self):
+        return 1 / self.capacity
+
+    @property
+    def error_bound(self):
+        return self.total / self.capacity
+
+    # -------------------------------------
+    # Updates
+    # -------------------------------------
+    def pop_min(self):
+        while True:
+            count, item = heapq.heappop(self.heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def add(self, item, weight=1):
+        self.total += weight
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            floor, victim = self.pop_min()
+            del self.counts[victim], self.errors[victim]
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+        heapq.heappush(self.heap, (self.counts[item], item))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def update(self, other):
+        if isinstance(other, SpaceSaving):
+            return self.merge(other)
+        # Heavy items first, so light ones are the ones that get evicted
+        for item, weight in sorted(dict(other).items(), key=lambda kv: -kv[1]):
+            self.add(item, int(weight))
+        return self
+
+    def merge(self, other):
+        """Combine two summaries; the error bound becomes eps * (N1 + N2)."""
+        floor_self = self.min_count() if len(self.counts) >= self.capacity else 0
+        floor_other = other.min_count() if len(other.counts) >= other.capacity else 0
+
+        counts, errors = {}, {}
+        for item in self.counts.keys() | other.counts.keys():
+            a, b = self.counts.get(item), other.counts.get(item)
+            counts[item] = (a if a is not None else floor_self) + (b if b is not None else floor_other)
+            errors[item] = ((self.errors[item] if a is not None else floor_self) +
+                            (other.errors[item] if b is not None else floor_other))
+
+        keep = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in keep}
+        self.errors = {item: errors[item] for item in keep}
+        self.total += other.total
+        self.heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self.heap)
+        return self
+
+    # -------------------------------------
+    # Queries
+    # -------------------------------------
+    def min_count(self):
+        return min(self.counts.values()) if self.counts else 0
+
+    def most_common(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda kv: -kv[1])
+        return ranked if n is None else ranked[:n]
+
+    def guaranteed(self, k):
+        """Items of the reported top-k that are certainly in the true top-k."""
+        ranked = self.most_common(k + 1)
+        threshold = ranked[k][1] if len(ranked) > k else 0
+        return [item for item, count in ranked[:k] if count - self.errors[item] >= threshold]
+
+
+# -------------------------------------
+# Divergence from the exact ranking
+# -------------------------------------
+def divergence(exact, summary, k=10):
+    """Compare a summary's top-k with exact counts (a value_counts Series)."""
+    exact_top = list(exact.head(k).index)
+    approx_top = [item for item, _ in summary.most_common(k)]
+    errors = [abs(count - exact.get(item, 0)) for item, count in summary.most_common(k)]
+    shared = set(exact_top) & set(approx_top)
+    return {
+        'k': k,
+        'capacity': summary.capacity,
+        'epsilon': summary.epsilon,
+        'total': summary.total,
+        'error_bound': round(summary.error_bound, 2),
+        'overlap': len(shared) / k,
+        'same_order': exact_top == approx_top,
+        'rank_displacement': sum(abs(exact_top.index(i) - approx_top.index(i)) for i in shared),
+        'max_abs_error': max(errors, default=0),
+        'guaranteed': len(summary.guaranteed(k)),
+    }
+
+
+def divergence_report(path, epsilon=0.001, k=10, chunksize=100_000):
+    from catalog import prepare_catalog
+    from schema import SCHEMA, apply_schema
+
+    columns = {'listed_in': 'Figure_1', 'country': 'Figure_2', 'cast': 'Figure_3'}
+    exact = {col: pd.Series(dtype='int64') for col in columns}
+    sketches = {col: SpaceSaving.for_error(epsilon) for col in columns}
+
+    for chunk in pd.read_csv(path, dtype=SCHEMA, chunksize=chunksize):
+        catalog = prepare_catalog(apply_schema(chunk))
+        for col in columns:
+            counts = catalog.multi(col).value_counts()
+            exact[col] = exact[col].add(counts, fill_value=0)
+            sketches[col].update(counts)
+
+    rows = {}
+    for col, figure in columns.items():
+        ranked = exact[col].astype('int64').sort_values(ascending=False, kind='stable')
+        rows[f'{figure} ({col})'] = divergence(ranked, sketches[col], k)
+    return pd.DataFrame(rows).T
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Approximate vs exact top-k on a catalog CSV')
+    parser.add_argument('path')
+    parser.add_argument('--epsilon', type=float, default=0.001)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+    print(divergence_report(args.path, args.epsilon, args.k, args.chunksize).to_string())